@@ -1,7 +1,21 @@
+from __future__ import annotations
+
+import csv
+import math
+import multiprocessing
+import os
 import statistics
-from typing import List
+from bisect import bisect_left
+from multiprocessing import shared_memory
+from typing import Callable, List, Optional, Tuple
 import doctest
 
+from economic_algorithms.instance import Instance, valuations_of
+from economic_algorithms.instrumentation import count
+from economic_algorithms.lazy import lazy_import
+
+np = lazy_import("numpy")
+
 
 def create_linear_functions(total_budget: float, threshold: float, num_citizens: int) -> List[float]:
     """
@@ -41,11 +55,13 @@ def binary_search_for_t(total_budget: float, citizen_votes: List[List[float]]) -
     :param citizen_votes: List of lists representing citizen votes on different topics.
     """
 
+    citizen_votes = valuations_of(citizen_votes)
     start = 0
     end = 1
     num_citizens = len(citizen_votes)
 
     while end > start:
+        count("binary_search_for_t.steps")
         threshold = (start + end) / 2
         linear_functions = create_linear_functions(total_budget, threshold, num_citizens)
         merged_votes = merge_votes_with_functions(citizen_votes, linear_functions)
@@ -62,12 +78,634 @@ def binary_search_for_t(total_budget: float, citizen_votes: List[List[float]]) -
             return medians_list
 
 
-def compute_budget(total_budget: float, citizen_votes: List[List[float]]) -> List[float]:
+def sort_topic_votes(citizen_votes: List[List[float]]) -> List[List[float]]:
+    """
+    Sorts the votes of every topic once, from the largest vote to the smallest.
+
+    :param citizen_votes: List of lists representing citizen votes on different topics.
+    :return: List with one descending list of votes per topic.
+
+    >>> sort_topic_votes([[3, 0, 27], [0, 20, 10], [15, 15, 0]])
+    [[15, 3, 0], [20, 15, 0], [27, 10, 0]]
+    """
+    if isinstance(citizen_votes, Instance):
+        return sorted_votes_matrix(citizen_votes).tolist()
+    return [sorted((citizen[i] for citizen in citizen_votes), reverse=True) for i in range(len(citizen_votes[0]))]
+
+
+def topic_median_line(total_budget: float, topic_votes: List[float], threshold: float) -> Tuple[float, float]:
+    """
+    Finds the linear piece (intercept, slope) of a topic's median around the given threshold.
+
+    The median of n votes and the n-1 phantoms is max over i of min(phantom_i, i-th largest vote),
+    so it is enough to find the first phantom that reaches its matching vote.
+
+    :param total_budget: Total budget for allocation.
+    :param topic_votes: Votes of a single topic, sorted from the largest to the smallest.
+    :param threshold: Threshold value of the phantoms.
+    :return: Tuple (intercept, slope) so that the median equals intercept + slope * threshold.
+
+    >>> topic_median_line(100, [100, 0], 0.25)
+    (0, 100)
+    >>> topic_median_line(30, [27, 10, 0], 0.5)
+    (0, 30)
+    """
+    num_citizens = len(topic_votes)
+    first = 1 + bisect_left(range(1, num_citizens), True,
+                            key=lambda i: total_budget * min(1, i * threshold) >= topic_votes[i - 1])
+    vote = topic_votes[first - 1]
+    previous = first - 1
+    if previous == 0 or vote >= total_budget * min(1, previous * threshold):
+        return vote, 0
+    if previous * threshold >= 1:
+        return total_budget, 0
+    return 0, total_budget * previous
+
+
+def medians_sum_at(total_budget: float, sorted_votes: List[List[float]], threshold: float) -> float:
+    """
+    Computes the sum of the topic medians for the given threshold.
+
+    :param total_budget: Total budget for allocation.
+    :param sorted_votes: Descending votes of every topic, see sort_topic_votes.
+    :param threshold: Threshold value of the phantoms.
+    :return: Sum of medians.
+    """
+    return sum(intercept + slope * threshold for intercept, slope in median_lines(total_budget, sorted_votes, threshold))
+
+
+def median_lines(total_budget: float, sorted_votes: List[List[float]], threshold: float) -> List[Tuple[float, float]]:
+    """
+    Finds the linear piece of every topic's median around the given threshold, see topic_median_line.
+
+    :param total_budget: Total budget for allocation.
+    :param sorted_votes: Descending votes of every topic, see sort_topic_votes.
+    :param threshold: Threshold value of the phantoms.
+    :return: List of (intercept, slope) for each topic.
+    """
+    return [topic_median_line(total_budget, topic_votes, threshold) for topic_votes in sorted_votes]
+
+
+def find_breakpoints(total_budget: float, sorted_votes: List[List[float]]) -> List[float]:
+    """
+    Lists every threshold in [0, 1] where the medians sum can change its slope.
+
+    These are the points where phantom i meets the i-th or the (i+1)-th largest vote of some topic,
+    and the points where phantom i reaches the total budget.
+
+    :param total_budget: Total budget for allocation.
+    :param sorted_votes: Descending votes of every topic, see sort_topic_votes.
+    :return: Sorted list of thresholds, including 0 and 1.
+
+    >>> find_breakpoints(100, [[100, 0], [0, 0], [100, 0]])
+    [0, 1]
+    >>> find_breakpoints(30, [[15, 3, 0], [20, 15, 0], [27, 10, 0]])
+    [0, 0.05, 0.1, 0.16666666666666666, 0.25, 0.3333333333333333, 0.5, 0.6666666666666666, 0.9, 1]
+    """
+    breakpoints = {0, 1}
+    if total_budget <= 0:
+        return sorted(breakpoints)
+    for topic_votes in sorted_votes:
+        for i in range(1, len(topic_votes)):
+            for vote in (topic_votes[i - 1], topic_votes[i]):
+                threshold = vote / (total_budget * i)
+                if 0 < threshold < 1:
+                    breakpoints.add(threshold)
+    for i in range(2, len(sorted_votes[0]) if sorted_votes else 0):
+        breakpoints.add(1 / i)
+    return sorted(breakpoints)
+
+
+def breakpoint_search_for_t(total_budget: float, citizen_votes: List[List[float]]) -> List[float]:
+    """
+    Finds the exact threshold for budget allocation.
+
+    The medians sum is piecewise linear in the threshold, so instead of bisecting floats we
+    bisect over its breakpoints and solve the linear segment that brackets the total budget.
+
+    :param total_budget: Total budget for allocation.
+    :param citizen_votes: List of lists representing citizen votes on different topics.
+    :return: List of medians for each topic.
+
+    >>> breakpoint_search_for_t(30, [[0, 0, 30], [15, 15, 0], [15, 15, 0]])
+    The right t is: 0.2
+    [12.0, 12.0, 6.0]
+    """
+    sorted_votes = sort_topic_votes(citizen_votes)
+    return solve_sorted_votes(total_budget, sorted_votes)
+
+
+def solve_sorted_votes(total_budget: float, sorted_votes: List[List[float]]) -> List[float]:
+    """
+    Runs the breakpoint search on votes that are already sorted per topic.
+
+    :param total_budget: Total budget for allocation.
+    :param sorted_votes: Descending votes of every topic, see sort_topic_votes.
+    :return: List of medians for each topic.
+    """
+    return solve_median_lines(total_budget, find_breakpoints(total_budget, sorted_votes),
+                              lambda threshold: median_lines(total_budget, sorted_votes, threshold))
+
+
+def solve_median_lines(total_budget: float, breakpoints: List[float],
+                       median_lines_at: Callable[[float], List[Tuple[float, float]]]) -> List[float]:
+    """
+    Runs the breakpoint search given the breakpoints and a function returning the median lines of all
+    topics for a threshold, so the topics can live in this process or be shared by TopicWorkers.
+
+    :param total_budget: Total budget for allocation.
+    :param breakpoints: Sorted breakpoints, see find_breakpoints.
+    :param median_lines_at: Function returning the (intercept, slope) of every topic for a threshold.
+    :return: List of medians for each topic.
+    """
+
+    def medians_sum(threshold):
+        return sum(intercept + slope * threshold for intercept, slope in median_lines_at(threshold))
+
+    count("breakpoint_search_for_t.breakpoints", len(breakpoints))
+    check_budget_reachable(total_budget, medians_sum(breakpoints[0]), medians_sum(breakpoints[-1]))
+
+    # Find the first breakpoint where the medians sum reaches the total budget
+    start = 0
+    end = len(breakpoints) - 1
+    while start < end:
+        count("breakpoint_search_for_t.steps")
+        middle = (start + end) // 2
+        if medians_sum(breakpoints[middle]) < total_budget:
+            start = middle + 1
+        else:
+            end = middle
+
+    if start == 0:
+        return solve_segment(total_budget, None, 0, median_lines_at)
+    return solve_segment(total_budget, breakpoints[start - 1], breakpoints[start], median_lines_at)
+
+
+def check_budget_reachable(total_budget: float, lowest_sum: float, highest_sum: float, rel_tol: float = 1e-9):
+    """
+    Raises ValueError unless the total budget lies between the medians sums at t=0 and t=1, up to rel_tol.
+    """
+    if highest_sum < total_budget and not math.isclose(highest_sum, total_budget, rel_tol=rel_tol):
+        raise ValueError("The medians sum never reaches the total budget, check the citizen votes.")
+    if lowest_sum > total_budget and not math.isclose(lowest_sum, total_budget, rel_tol=rel_tol):
+        raise ValueError("The medians sum is always above the total budget, check the citizen votes.")
+
+
+def solve_segment(total_budget: float, low: Optional[float], high: float,
+                  median_lines_at: Callable[[float], List[Tuple[float, float]]]) -> List[float]:
+    """
+    Solves the threshold on the linear segment between two consecutive breakpoints and prints it.
+
+    :param total_budget: Total budget for allocation.
+    :param low: Last breakpoint below the total budget, None when the budget is reached at t=0.
+    :param high: First breakpoint where the medians sum reaches the total budget.
+    :param median_lines_at: Function returning the (intercept, slope) of every topic for a threshold.
+    :return: List of medians for each topic.
+    """
+    if low is None:
+        threshold = high
+        lines = median_lines_at(threshold)
+    else:
+        # The medians sum is linear between the two breakpoints, solve it
+        lines = median_lines_at((low + high) / 2)
+        intercepts_sum = sum(intercept for intercept, _ in lines)
+        slopes_sum = sum(slope for _, slope in lines)
+        threshold = high if slopes_sum == 0 else (total_budget - intercepts_sum) / slopes_sum
+
+    print("The right t is:", threshold)
+    return [intercept + slope * threshold if slope else intercept for intercept, slope in lines]
+
+
+def sorted_votes_matrix(citizen_votes: List[List[float]]) -> np.ndarray:
+    """
+    Builds a topics x citizens matrix where every row holds the topic votes from the largest to the smallest.
+
+    :param citizen_votes: List of lists representing citizen votes on different topics.
+    :return: NumPy matrix of sorted votes, sorted only once per topic.
+
+    >>> sorted_votes_matrix([[3, 0, 27], [0, 20, 10], [15, 15, 0]])
+    array([[15.,  3.,  0.],
+           [20., 15.,  0.],
+           [27., 10.,  0.]])
+    """
+    votes = np.asarray(valuations_of(citizen_votes, as_lists=False), dtype=float).T
+    return -np.sort(-votes, axis=1)
+
+
+def numpy_medians(total_budget: float, votes_matrix: np.ndarray, threshold: float) -> np.ndarray:
+    """
+    Computes the median of every topic for the given threshold without merging and sorting.
+
+    Phantom i meets the votes from the i-th largest vote downwards, so the median is found by
+    bisecting for the first phantom that reaches its matching vote, for all topics at once.
+
+    :param total_budget: Total budget for allocation.
+    :param votes_matrix: Sorted votes matrix, see sorted_votes_matrix.
+    :param threshold: Threshold value for creating linear functions.
+    :return: NumPy array of medians for each topic.
+
+    >>> numpy_medians(30, sorted_votes_matrix([[3, 0, 27], [0, 20, 10], [15, 15, 0]]), 2 / 9)
+    array([ 6.66666667, 13.33333333, 10.        ])
+    """
+    phantoms, first = numpy_first_reached(total_budget, votes_matrix, threshold)
+    return np.maximum(phantoms[first - 1], votes_matrix[np.arange(len(first)), first - 1])
+
+
+def numpy_first_reached(total_budget: float, votes_matrix: np.ndarray, threshold: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Bisects every topic for the first phantom that reaches its matching vote, see topic_median_line.
+
+    :param total_budget: Total budget for allocation.
+    :param votes_matrix: Sorted votes matrix, see sorted_votes_matrix.
+    :param threshold: Threshold value for creating linear functions.
+    :return: The phantoms, and for every topic the index of the first phantom that reaches its vote
+             (the number of citizens if none does).
+    """
+    num_topics, num_citizens = votes_matrix.shape
+    # phantoms[i] is the i-th linear function, phantoms[0] is a sentinel that never wins the median
+    phantoms = np.empty(num_citizens)
+    phantoms[0] = -np.inf
+    phantoms[1:] = total_budget * np.minimum(1, np.arange(1, num_citizens) * threshold)
+
+    rows = np.arange(num_topics)
+    start = np.ones(num_topics, dtype=int)
+    end = np.full(num_topics, num_citizens)
+    while np.any(start < end):
+        middle = np.minimum((start + end) // 2, num_citizens - 1)
+        reached = phantoms[middle] >= votes_matrix[rows, middle - 1]
+        searching = start < end
+        end = np.where(searching & reached, middle, end)
+        start = np.where(searching & ~reached, middle + 1, start)
+    return phantoms, start
+
+
+def numpy_median_lines(total_budget: float, votes_matrix: np.ndarray,
+                       threshold: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Same as median_lines for all the topics of a sorted votes matrix at once.
+
+    :param total_budget: Total budget for allocation.
+    :param votes_matrix: Sorted votes matrix, see sorted_votes_matrix.
+    :param threshold: Threshold value of the phantoms.
+    :return: Arrays of the intercepts and of the slopes of the topics.
+
+    >>> numpy_median_lines(30, sorted_votes_matrix([[3, 0, 27], [0, 20, 10], [15, 15, 0]]), 0.5)
+    (array([15., 15.,  0.]), array([ 0.,  0., 30.]))
+    """
+    _, first = numpy_first_reached(total_budget, votes_matrix, threshold)
+    votes = votes_matrix[np.arange(len(first)), first - 1]
+    previous = first - 1
+    flat = (previous == 0) | (votes >= total_budget * np.minimum(1, previous * threshold))
+    full = ~flat & (previous * threshold >= 1)
+    intercepts = np.where(flat, votes, np.where(full, total_budget, 0))
+    slopes = np.where(flat | full, 0, total_budget * previous)
+    return intercepts.astype(float), slopes.astype(float)
+
+
+def numpy_breakpoints(total_budget: float, votes_matrix: np.ndarray) -> np.ndarray:
+    """
+    Same as find_breakpoints for the topics of a sorted votes matrix.
+
+    >>> numpy_breakpoints(30, sorted_votes_matrix([[3, 0, 27], [0, 20, 10], [15, 15, 0]])).tolist()
+    [0.0, 0.05, 0.1, 0.16666666666666666, 0.25, 0.3333333333333333, 0.5, 0.6666666666666666, 0.9, 1.0]
+    """
+    num_citizens = votes_matrix.shape[1]
+    if total_budget <= 0:
+        return np.array([0.0, 1.0])
+    scale = total_budget * np.arange(1, num_citizens)
+    thresholds = np.concatenate([(votes_matrix[:, :-1] / scale).ravel(), (votes_matrix[:, 1:] / scale).ravel(),
+                                 1 / np.arange(2, num_citizens), [0, 1]])
+    return np.unique(thresholds[(0 <= thresholds) & (thresholds <= 1)])
+
+
+def numpy_binary_search_for_t(total_budget: float, citizen_votes: List[List[float]]) -> List[float]:
+    """
+    Same search as binary_search_for_t, but every step is done with NumPy arrays on votes sorted once.
+    The search stops when the threshold cannot be split any further.
+
+    :param total_budget: Total budget for allocation.
+    :param citizen_votes: List of lists representing citizen votes on different topics.
+    :return: List of medians for each topic.
+
+    >>> numpy_binary_search_for_t(100, [[100, 0, 0], [0, 0, 100]])
+    The right t is: 0.5
+    [50.0, 0.0, 50.0]
+    """
+    return search_votes_matrix(total_budget, sorted_votes_matrix(citizen_votes))
+
+
+def search_votes_matrix(total_budget: float, votes_matrix: np.ndarray, workers: Optional[int] = None) -> List[float]:
+    """
+    Runs the NumPy threshold search on an already sorted votes matrix.
+
+    :param total_budget: Total budget for allocation.
+    :param votes_matrix: Sorted votes matrix, see sorted_votes_matrix or read_votes_file.
+    :param workers: Number of processes sharing the topics, None to search in this process.
+    :return: List of medians for each topic.
+    """
+    if workers is not None and workers > 1:
+        with TopicWorkers(total_budget, votes_matrix, workers) as topic_workers:
+            threshold = search_threshold(total_budget, topic_workers.numpy_medians_sum)
+    else:
+        threshold = search_threshold(total_budget,
+                                     lambda t: numpy_medians(total_budget, votes_matrix, t).sum())
+
+    print("The right t is:", threshold)
+    return numpy_medians(total_budget, votes_matrix, threshold).tolist()
+
+
+def search_threshold(total_budget: float, medians_sum_at_threshold: Callable[[float], float]) -> float:
+    """
+    Bisects the threshold until the medians sum equals the total budget, or until the
+    threshold cannot be split any further.
+
+    :param total_budget: Total budget for allocation.
+    :param medians_sum_at_threshold: Function returning the medians sum for a threshold.
+    :return: The threshold.
+
+    >>> search_threshold(100, lambda t: 20 * t)
+    Traceback (most recent call last):
+    ...
+    ValueError: The medians sum never reaches the total budget, check the citizen votes.
+    """
+    start = 0
+    end = 1
+
+    # The votes may be float32, so the ends are only compared up to float32 precision
+    check_budget_reachable(total_budget, medians_sum_at_threshold(start), medians_sum_at_threshold(end),
+                           rel_tol=1e-6)
+
+    while True:
+        count("search_threshold.steps")
+        threshold = (start + end) / 2
+        medians_sum = medians_sum_at_threshold(threshold)
+
+        if medians_sum < total_budget and start < threshold < end:
+            start = threshold
+        elif medians_sum > total_budget and start < threshold < end:
+            end = threshold
+        else:
+            return threshold
+
+
+def solve_topic_workers(total_budget: float, topic_workers: TopicWorkers) -> List[float]:
+    """
+    Same search as solve_median_lines, on topics shared by TopicWorkers. The breakpoints stay in the
+    workers: every step bisects on a breakpoint they agree on, so the parent never collects them all.
+
+    :param total_budget: Total budget for allocation.
+    :param topic_workers: Workers holding the sorted votes.
+    :return: List of medians for each topic.
+    """
+    lowest_sum = topic_workers.medians_sum(0)
+    check_budget_reachable(total_budget, lowest_sum, topic_workers.medians_sum(1))
+    if lowest_sum >= total_budget:
+        return solve_segment(total_budget, None, 0, topic_workers.median_lines)
+
+    # The medians sum is below the budget at low and reaches it at high, both are breakpoints
+    low, high = 0, 1
+    while True:
+        middle = topic_workers.breakpoint_between(low, high)
+        if middle is None:
+            break
+        count("breakpoint_search_for_t.steps")
+        if topic_workers.medians_sum(middle) < total_budget:
+            low = middle
+        else:
+            high = middle
+    return solve_segment(total_budget, low, high, topic_workers.median_lines)
+
+
+def topic_worker(connection, memory_name: str, shape: Tuple[int, int], dtype: str, first: int, last: int,
+                 total_budget: float):
+    """
+    Worker process loop: receives (request, argument) pairs and answers them for its topics.
+    The votes are read from shared memory, so they are never pickled. Apart from the final
+    median_lines request, every answer is a few numbers whatever the number of topics.
+    """
+    memory = shared_memory.SharedMemory(name=memory_name)
+    votes_matrix = np.ndarray(shape, dtype=dtype, buffer=memory.buf)[first:last]
+    breakpoints = None
+    try:
+        while True:
+            request = connection.recv()
+            if request is None:
+                break
+            name, argument = request
+            if name == "numpy_medians_sum":
+                connection.send(float(numpy_medians(total_budget, votes_matrix, argument).sum()))
+            elif name == "median_line_sums":
+                intercepts, slopes = numpy_median_lines(total_budget, votes_matrix, argument)
+                connection.send((float(intercepts.sum()), float(slopes.sum())))
+            elif name == "breakpoints_between":
+                # The breakpoints stay here, only their number and the middle one inside (low, high) are sent
+                if breakpoints is None:
+                    breakpoints = numpy_breakpoints(total_budget, votes_matrix)
+                low, high = argument
+                start = int(np.searchsorted(breakpoints, low, side="right"))
+                end = int(np.searchsorted(breakpoints, high, side="left"))
+                connection.send((end - start, float(breakpoints[(start + end) // 2]) if start < end else None))
+            else:
+                intercepts, slopes = numpy_median_lines(total_budget, votes_matrix, argument)
+                connection.send(list(zip(intercepts.tolist(), slopes.tolist())))
+    finally:
+        del votes_matrix
+        memory.close()
+
+
+class TopicWorkers:
+    """
+    Processes that each hold a fixed shard of the topics of a sorted votes matrix kept in shared memory.
+
+    >>> with TopicWorkers(30, sorted_votes_matrix([[3, 0, 27], [0, 20, 10], [15, 15, 0]]), 2) as workers:
+    ...     round(workers.numpy_medians_sum(2 / 9), 6), workers.medians_sum(0.5), workers.median_lines(0.5)
+    (30.0, 45.0, [(15.0, 0.0), (15.0, 0.0), (0.0, 30.0)])
+    """
+
+    def __init__(self, total_budget: float, votes_matrix: np.ndarray, workers: int):
+        num_topics = votes_matrix.shape[0]
+        workers = max(1, min(workers, num_topics))
+
+        self.memory = shared_memory.SharedMemory(create=True, size=max(1, votes_matrix.nbytes))
+        self.connections = []
+        self.processes = []
+        try:
+            shared_votes = np.ndarray(votes_matrix.shape, dtype=votes_matrix.dtype, buffer=self.memory.buf)
+            shared_votes[:] = votes_matrix
+            del shared_votes
+
+            bounds = np.linspace(0, num_topics, workers + 1).astype(int)
+            for first, last in zip(bounds, bounds[1:]):
+                parent_connection, child_connection = multiprocessing.Pipe()
+                self.connections.append(parent_connection)
+                process = multiprocessing.Process(target=topic_worker, daemon=True,
+                                                  args=(child_connection, self.memory.name, votes_matrix.shape,
+                                                        votes_matrix.dtype.str, int(first), int(last), total_budget))
+                process.start()
+                self.processes.append(process)
+                # Only the worker keeps its end, so recv fails instead of waiting if the worker dies
+                child_connection.close()
+        except BaseException:
+            self.close()
+            raise
+
+    def ask(self, name: str, argument=None) -> list:
+        """
+        Sends a request to every worker and returns their answers in the order of the topics.
+        """
+        for connection in self.connections:
+            connection.send((name, argument))
+        return [connection.recv() for connection in self.connections]
+
+    def numpy_medians_sum(self, threshold: float) -> float:
+        """
+        Adds up the sums of the NumPy medians of every worker, see numpy_medians.
+        """
+        return sum(self.ask("numpy_medians_sum", threshold))
+
+    def medians_sum(self, threshold: float) -> float:
+        """
+        Adds up the sums of the median lines of every worker at the threshold, see median_lines.
+        """
+        sums = self.ask("median_line_sums", threshold)
+        return sum(intercepts_sum for intercepts_sum, _ in sums) + sum(slopes_sum for _, slopes_sum in sums) * threshold
+
+    def breakpoint_between(self, low: float, high: float) -> Optional[float]:
+        """
+        Picks a breakpoint strictly between low and high that splits the breakpoints of all the workers
+        at least one to three, or returns None if there is no breakpoint left between them.
+        """
+        answers = sorted((middle, size) for size, middle in self.ask("breakpoints_between", (low, high)) if size)
+        remaining = sum(size for _, size in answers)
+        # Weighted median of the middle breakpoints of the workers
+        for middle, size in answers:
+            remaining -= 2 * size
+            if remaining <= 0:
+                return middle
+        return None
+
+    def median_lines(self, threshold: float) -> List[Tuple[float, float]]:
+        """
+        Concatenates the median lines of every worker, see median_lines.
+        """
+        return [line for lines in self.ask("median_lines", threshold) for line in lines]
+
+    def close(self):
+        """
+        Stops the workers and releases the shared memory, also when a worker has failed.
+        """
+        try:
+            for connection in self.connections:
+                try:
+                    connection.send(None)
+                except OSError:
+                    # The worker is gone already
+                    pass
+                connection.close()
+            for process in self.processes:
+                process.join(timeout=1)
+                if process.is_alive():
+                    process.terminate()
+                    process.join()
+        finally:
+            self.memory.close()
+            self.memory.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_votes_csv(path: str, chunk_size: int) -> np.ndarray:
+    """
+    Parses a CSV file of votes (one citizen per line, one topic per column) row by row.
+
+    Every row is converted straight into a float32 matrix of citizens x topics. The matrix
+    starts with room for chunk_size citizens and doubles in place when it is full.
+
+    :param path: Path of the CSV file.
+    :param chunk_size: Number of citizens allocated at first.
+    :return: float32 array of shape (citizens, topics).
+    """
+    votes = None
+    num_citizens = 0
+    with open(path, newline="") as votes_file:
+        for row in csv.reader(votes_file):
+            if not row:
+                continue
+            if votes is None:
+                votes = np.empty((max(1, chunk_size), len(row)), dtype=np.float32)
+            elif num_citizens == votes.shape[0]:
+                votes.resize((2 * num_citizens, votes.shape[1]), refcheck=False)
+            votes[num_citizens] = row
+            num_citizens += 1
+    if votes is None:
+        raise ValueError("The votes file is empty.")
+    votes.resize((num_citizens, votes.shape[1]), refcheck=False)
+    return votes
+
+
+def read_votes_file(path: str, num_topics: Optional[int] = None, chunk_size: int = 65536) -> np.ndarray:
+    """
+    Reads citizen votes from a file in a single pass and returns the sorted votes matrix.
+
+    Supported files are NumPy .npy files and raw float32 files (both memory-mapped),
+    and .csv files (parsed row by row). The votes are kept as float32 and sorted in place,
+    so the Python matrix of votes is never built.
+
+    :param path: Path of the votes file, one citizen per row and one topic per column.
+    :param num_topics: Number of topics, required for raw float32 files.
+    :param chunk_size: Number of citizens copied (or allocated, for .csv files) at a time.
+    :return: Sorted votes matrix, the same layout as sorted_votes_matrix.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        # The number of citizens is unknown until the end of the stream, so the citizens stay rows
+        # and every topic is sorted in its column
+        votes = read_votes_csv(path, chunk_size)
+        votes.sort(axis=0)
+        return votes[::-1].T
+
+    if extension == ".npy":
+        votes = np.load(path, mmap_mode="r")
+    elif num_topics is None:
+        raise ValueError("num_topics is required to read a raw float32 votes file.")
+    else:
+        votes = np.memmap(path, dtype=np.float32, mode="r").reshape(-1, num_topics)
+    # Each topic becomes a contiguous row so it can be sorted in place
+    columns = np.empty((votes.shape[1], votes.shape[0]), dtype=np.float32)
+    for first in range(0, votes.shape[0], chunk_size):
+        columns[:, first:first + chunk_size] = votes[first:first + chunk_size].T
+
+    columns.sort(axis=1)
+    return columns[:, ::-1]
+
+
+def compute_budget_from_file(total_budget: float, path: str, num_topics: Optional[int] = None,
+                             workers: Optional[int] = None) -> List[float]:
+    """
+    Computes the budget allocation for votes stored in a file, see read_votes_file.
+
+    :param total_budget: Total budget available for allocation.
+    :param path: Path of the votes file.
+    :param num_topics: Number of topics, required for raw float32 files.
+    :param workers: Number of processes sharing the topics, None to search in this process.
+    :return: List of medians for each topic.
+    """
+    return search_votes_matrix(total_budget, read_votes_file(path, num_topics), workers)
+
+
+def compute_budget(total_budget: float, citizen_votes: List[List[float]], workers: Optional[int] = None) -> List[float]:
     """
     Computes the budget allocation based on citizen votes and total budget.
 
     :param total_budget: Total budget available for allocation.
-    :param citizen_votes: List of lists representing citizen votes on different topics.
+    :param citizen_votes: List of lists representing citizen votes on different topics,
+                          or an Instance whose valuations are citizens x topics.
+    :param workers: Number of processes sharing the topics, None to search in this process.
+                    The search is exact either way, and so is the printed threshold.
     :return: List of medians for each topic.
 
     Examples: (taken from leature)
@@ -92,7 +730,10 @@ def compute_budget(total_budget: float, citizen_votes: List[List[float]]) -> Lis
     [6.666666666666666, 13.333333333333332, 10]
 
     """
-    return binary_search_for_t(total_budget, citizen_votes)
+    if workers is not None and workers > 1:
+        with TopicWorkers(total_budget, sorted_votes_matrix(citizen_votes), workers) as topic_workers:
+            return solve_topic_workers(total_budget, topic_workers)
+    return breakpoint_search_for_t(total_budget, citizen_votes)
 
 
 if __name__ == "__main__":
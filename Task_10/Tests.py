@@ -0,0 +1,145 @@
+import os
+import random
+import tempfile
+import unittest
+import unittest.mock
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from economic_algorithms.instrumentation import collect
+
+from economic_algorithms.Task_10.Question5 import TopicWorkers, compute_budget, compute_budget_from_file, \
+    numpy_binary_search_for_t, read_votes_file, sorted_votes_matrix
+
+
+def random_votes(num_citizens, num_topics, total_budget):
+    votes = []
+    for _ in range(num_citizens):
+        weights = [random.random() for _ in range(num_topics)]
+        votes.append([total_budget * weight / sum(weights) for weight in weights])
+    return votes
+
+
+class TestVotesFiles(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.votes = [[3, 0, 27], [0, 20, 10], [15, 15, 0]]
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.directory.name, name)
+
+    def test_npy_file(self):
+        np.save(self.path("votes.npy"), np.array(self.votes, dtype=np.float32))
+        matrix = read_votes_file(self.path("votes.npy"), chunk_size=2)
+        self.assertTrue(np.array_equal(matrix, sorted_votes_matrix(self.votes)))
+
+    def test_raw_float32_file(self):
+        np.array(self.votes, dtype=np.float32).tofile(self.path("votes.f32"))
+        matrix = read_votes_file(self.path("votes.f32"), num_topics=3, chunk_size=2)
+        self.assertTrue(np.array_equal(matrix, sorted_votes_matrix(self.votes)))
+
+    def test_raw_file_without_topics(self):
+        np.array(self.votes, dtype=np.float32).tofile(self.path("votes.f32"))
+        with self.assertRaises(ValueError):
+            read_votes_file(self.path("votes.f32"))
+
+    def test_csv_file(self):
+        with open(self.path("votes.csv"), "w") as votes_file:
+            votes_file.write("\n".join(",".join(str(vote) for vote in citizen) for citizen in self.votes) + "\n")
+        matrix = read_votes_file(self.path("votes.csv"), chunk_size=2)
+        self.assertTrue(np.array_equal(matrix, sorted_votes_matrix(self.votes)))
+
+    def test_budget_from_file(self):
+        np.save(self.path("votes.npy"), np.array(self.votes, dtype=np.float32))
+        medians = compute_budget_from_file(30, self.path("votes.npy"))
+        self.assertTrue(np.allclose(medians, [20 / 3, 40 / 3, 10], atol=1e-4))
+
+    def test_unreachable_budget_from_file(self):
+        np.save(self.path("votes.npy"), np.array(self.votes, dtype=np.float32))
+        with self.assertRaises(ValueError):
+            compute_budget_from_file(1000, self.path("votes.npy"))
+
+
+class TestSolvers(unittest.TestCase):
+    def test_exact_and_numpy_solvers_agree(self):
+        random.seed(10)
+        for num_citizens, num_topics in [(1, 3), (2, 2), (5, 4), (30, 10)]:
+            votes = random_votes(num_citizens, num_topics, 100)
+            exact = compute_budget(100, votes)
+            self.assertAlmostEqual(sum(exact), 100)
+            self.assertTrue(np.allclose(exact, numpy_binary_search_for_t(100, votes)))
+
+    def test_unreachable_budget(self):
+        # The medians sum is 0 for every threshold, or 200 already at t=0
+        with self.assertRaises(ValueError):
+            compute_budget(100, [[0, 0], [0, 0]])
+        with self.assertRaises(ValueError):
+            compute_budget(10, [[100, 100], [100, 100]])
+        with self.assertRaises(ValueError):
+            compute_budget(10, [[100, 100], [100, 100]], workers=2)
+
+    def test_unreachable_budget_numpy(self):
+        with self.assertRaises(ValueError):
+            numpy_binary_search_for_t(100, [[10, 0], [0, 10]])
+        with self.assertRaises(ValueError):
+            numpy_binary_search_for_t(10, [[100, 100], [100, 100]])
+
+    def test_workers(self):
+        random.seed(11)
+        votes = random_votes(40, 7, 100)
+        # Same exact search, so the same medians whatever the number of workers
+        self.assertEqual(compute_budget(100, votes), compute_budget(100, votes, workers=3))
+
+    def test_more_workers_than_topics(self):
+        self.assertTrue(np.allclose(compute_budget(100, [[100, 0], [0, 100]], workers=4), [50, 50]))
+
+    def assert_released(self, memory_name):
+        with self.assertRaises(FileNotFoundError):
+            shared_memory.SharedMemory(name=memory_name)
+
+    def test_workers_are_released_when_one_dies(self):
+        workers = TopicWorkers(100, sorted_votes_matrix(random_votes(10, 4, 100)), 2)
+        workers.processes[0].kill()
+        workers.processes[0].join()
+        with self.assertRaises((EOFError, OSError)):
+            workers.median_lines(0.5)
+        workers.close()
+        self.assertFalse(any(process.is_alive() for process in workers.processes))
+        self.assert_released(workers.memory.name)
+
+    def test_workers_are_released_when_a_start_fails(self):
+        created = []
+        original_init = shared_memory.SharedMemory.__init__
+
+        def record_memory(memory, *args, **kwargs):
+            original_init(memory, *args, **kwargs)
+            created.append(memory.name)
+
+        with unittest.mock.patch.object(shared_memory.SharedMemory, "__init__", record_memory), \
+                unittest.mock.patch("multiprocessing.Process.start", side_effect=OSError("no more processes")):
+            with self.assertRaises(OSError):
+                TopicWorkers(100, sorted_votes_matrix(random_votes(10, 4, 100)), 2)
+        self.assert_released(created[0])
+
+
+class TestInstrumentation(unittest.TestCase):
+    def test_search_steps_are_counted(self):
+        with collect() as stats:
+            compute_budget(100, [[100, 0, 0], [0, 0, 100]])
+            numpy_binary_search_for_t(100, [[100, 0, 0], [0, 0, 100]])
+        self.assertEqual(stats.counters["search_threshold.steps"], 1)
+        self.assertGreater(stats.counters["breakpoint_search_for_t.breakpoints"], 0)
+
+    def test_nothing_is_collected_outside_the_block(self):
+        with collect() as stats:
+            pass
+        compute_budget(100, [[100, 0, 0], [0, 0, 100]])
+        self.assertEqual(stats.counters, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,4 +1,12 @@
-import numpy as np
+from __future__ import annotations
+
+import math
+
+from economic_algorithms.instance import Instance, valuations_of
+from economic_algorithms.instrumentation import count
+from economic_algorithms.lazy import lazy_import
+
+np = lazy_import("numpy")
 
 
 """
@@ -26,7 +34,7 @@ def weighted_round_robin(rights: list[float], valuations: list[list[float]], y:
 
        Parameters:
        - rights (list): List of rights for each player.
-       - valuations (list): List of lists representing player valuations for each item.
+       - valuations (list): List of lists representing player valuations for each item, or an Instance.
        - y (float): Balancing parameter.
 
        Returns:
@@ -56,6 +64,8 @@ def weighted_round_robin(rights: list[float], valuations: list[list[float]], y:
        [[2], [0], [1]]
 
        """
+    if isinstance(valuations, Instance):
+        return weighted_round_robin_matrix(rights, valuations_of(valuations, as_lists=False), y)
     if len(valuations) == 0 or len(rights) == 0:
         return []
 
@@ -69,13 +79,16 @@ def weighted_round_robin(rights: list[float], valuations: list[list[float]], y:
     remaining = [True] * n_items
 
     while any(remaining):
-        # Calculate the number of items allocated to each player
-        items_per_player = np.array([len(a) for a in allocation])
-
-        # Calculate the quotients for each player
-        quotients = rights / (items_per_player + y)
-
-        best_player = np.argmax(quotients)
+        count("weighted_round_robin.rounds")
+        # Calculate the quotients for each player: rights / (items_per_player + y),
+        # a player with no items when y=0 has an infinite quotient
+        quotients = []
+        for i in range(n_players):
+            denominator = len(allocation[i]) + y
+            quotients.append(rights[i] / denominator if denominator else math.inf)
+
+        # The first player with the highest quotient
+        best_player = max(range(n_players), key=quotients.__getitem__)
         best_item = find_best_item(valuations[best_player], remaining)
 
         # Allocate the best item if found
@@ -87,6 +100,53 @@ def weighted_round_robin(rights: list[float], valuations: list[list[float]], y:
     return allocation
 
 
+def weighted_round_robin_matrix(rights: list[float], valuations: np.ndarray, y: float):
+    """
+    Same as weighted_round_robin on a NumPy valuations matrix, such as the one of an Instance.
+    Every round finds the player and the item with array operations instead of Python loops.
+
+    >>> weighted_round_robin_matrix([1, 2], np.array([[1, 2, 3], [3, 2, 1]]), 0)
+    Player 0 takes item 2 with value 3
+    Player 1 takes item 0 with value 3
+    Player 1 takes item 1 with value 2
+    [[2], [0, 1]]
+    """
+    if len(valuations) == 0 or len(rights) == 0:
+        return []
+
+    n_players = len(rights)
+    n_items = valuations.shape[1]
+    rights = np.asarray(rights, dtype=float)
+
+    allocation = [[] for _ in range(n_players)]
+    items_per_player = np.zeros(n_players)
+    remaining = np.ones(n_items, dtype=bool)
+    # find_best_item only takes an item worth more than -1
+    wanted = valuations > -1
+
+    while remaining.any():
+        count("weighted_round_robin.rounds")
+        # rights / (items_per_player + y), infinite for a player with no items when y=0
+        denominators = items_per_player + y
+        with np.errstate(divide="ignore", invalid="ignore"):
+            quotients = np.where(denominators == 0, np.inf, rights / denominators)
+
+        # argmax gives the first player with the highest quotient, and the first item with the highest value
+        best_player = int(np.argmax(quotients))
+        available = remaining & wanted[best_player]
+        if available.any():
+            best_item = int(np.argmax(np.where(available, valuations[best_player], -np.inf)))
+        else:
+            best_item = -1
+
+        print(f"Player {best_player} takes item {best_item} with value {valuations[best_player][best_item]}")
+        allocation[best_player].append(best_item)
+        items_per_player[best_player] += 1
+        remaining[best_item] = False
+
+    return allocation
+
+
 def find_best_item(player_valuations, remaining_items):
     best_item = -1
     best_value = -1
@@ -1,7 +1,7 @@
 import unittest
 import random
 
-from Question2 import weighted_round_robin
+from economic_algorithms.Task_3.Question2 import weighted_round_robin
 
 
 class TestWRR(unittest.TestCase):
@@ -21,6 +21,11 @@ class TestWRR(unittest.TestCase):
 
         self.assertEqual(valuations[1][allocation[1][0]], 55)
 
+    def test_zero_balancing_parameter(self):
+        # With y=0 every player without items has an infinite quotient, the first one chooses first
+        allocation = weighted_round_robin([1, 2], [[1, 2, 3], [3, 2, 1]], 0)
+        self.assertEqual(allocation, [[2], [0, 1]])
+
     def test_randomized_valuations(self):
         rights = [1, 2, 3]
         valuations = []
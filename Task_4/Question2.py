@@ -4,29 +4,37 @@ import operator
 from collections import deque
 from typing import List
 
+from economic_algorithms.instance import valuations_of
+from economic_algorithms.instrumentation import count
+
 
 def egalitarian_allocation(valuations: List[List[float]], purging_rule1: bool = True, purging_rule2: bool = True):
     """
     Find an egalitarian allocation of items between two players based on their valuations.
 
     Args:
-    - valuations (list of lists): A list of two lists representing the valuations of each player for each item.
+    - valuations (list of lists): A list of two lists representing the valuations of each player for each item,
+      or an Instance.
     - purging_rule1 (bool): Whether to apply the first pruning rule.
     - purging_rule2 (bool): Whether to apply the second pruning rule.
 
     Returns:
-    - tuple: A tuple containing two lists, representing the items allocated to each player in the egalitarian allocation.
+    - list: Two lists, representing the items allocated to each player in the egalitarian allocation,
+      or None when no fair allocation exists.
 
     Examples:
     >>> egalitarian_allocation([[4, 5, 6, 7, 8], [8, 7, 6, 5, 4]], purging_rule1=True, purging_rule2=True)
     Player 0 gets items [3, 4] with value 15
     Player 1 gets items [0, 1, 2] with value 21
+    [[3, 4], [0, 1, 2]]
 
     >>> egalitarian_allocation([[1, 1, 1, 1], [1, 1, 1, 1]], purging_rule1=True, purging_rule2=True)
     Player 0 gets items [1, 2] with value 2
     Player 1 gets items [0, 3] with value 2
+    [[1, 2], [0, 3]]
 
     """
+    valuations = valuations_of(valuations)
     num_items = len(valuations[0])  # Number of items
 
     initial_state = [0, [], []]  # Initial state - empty allocation for both players
@@ -41,6 +49,7 @@ def egalitarian_allocation(valuations: List[List[float]], purging_rule1: bool =
 
     while states:
         state = states.popleft()
+        count("egalitarian_allocation.states_expanded")
         num_allocated, player1_alloc, player2_alloc = state
 
         remaining_items = set(range(num_items)) - set(player1_alloc + player2_alloc)
@@ -51,10 +60,15 @@ def egalitarian_allocation(valuations: List[List[float]], purging_rule1: bool =
                                        tuple(sorted(player2_alloc))))
             else:
                 explore_next_states(states, state, remaining_items, purging_rule2)
+        else:
+            count("egalitarian_allocation.states_pruned")
+
+    count("egalitarian_allocation.final_allocations", len(final_allocations))
 
     best_alloc = find_best_allocation_max_min(final_allocations, valuations)
 
     print_allocation(best_alloc, valuations)
+    return best_alloc
 
 
 def apply_pruning_rule(state, player1_values, player2_values, remaining_items, purging_rule1, purging_rule2):
@@ -161,13 +175,16 @@ def product_maximizing_allocation(valuations: List[List[float]], purging_rule1:
     Finds an allocation of items between two players that maximizes the product of their values.
 
     Args:
-    - valuations (list of lists): A list of two lists representing the valuations of each player for each item.
+    - valuations (list of lists): A list of two lists representing the valuations of each player for each item,
+      or an Instance.
     - purging_rule1 (bool): Whether to apply the first pruning rule.
     - purging_rule2 (bool): Whether to apply the second pruning rule.
 
     Returns:
-    - tuple: A tuple containing two lists, representing the items allocated to each player in the product-maximizing allocation.
+    - list: Two lists, representing the items allocated to each player in the product-maximizing allocation,
+      or None when no fair allocation exists.
     """
+    valuations = valuations_of(valuations)
     num_items = len(valuations[0])  # Number of items
 
     initial_state = [0, [], []]  # Initial state - empty allocation for both players
@@ -182,6 +199,7 @@ def product_maximizing_allocation(valuations: List[List[float]], purging_rule1:
 
     while states:  # While there are states to explore
         state = states.popleft()
+        count("product_maximizing_allocation.states_expanded")
         num_allocated, player1_alloc, player2_alloc = state  # Unpack state
 
         remaining_items = set(range(num_items)) - set(player1_alloc + player2_alloc)
@@ -192,10 +210,15 @@ def product_maximizing_allocation(valuations: List[List[float]], purging_rule1:
                                        tuple(sorted(player2_alloc))))
             else:
                 explore_next_states(states, state, remaining_items, purging_rule2)
+        else:
+            count("product_maximizing_allocation.states_pruned")
+
+    count("product_maximizing_allocation.final_allocations", len(final_allocations))
 
     best_alloc = find_best_allocation_product(final_allocations, valuations)
 
     print_allocation(best_alloc, valuations)
+    return best_alloc
 
 
 if __name__ == "__main__":
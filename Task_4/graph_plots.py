@@ -1,13 +1,13 @@
 import time
 import matplotlib.pyplot as plt
-from first_answer import egalitarian_allocation
+from economic_algorithms.Task_4.Question2 import egalitarian_allocation
 
 
 # Function to measure the runtime of egalitarian_allocation for a given number of items and purging rules
 def measure_runtime(num_items, purging_rule1, purging_rule2):
     valuations = [[1] * num_items, [2] * num_items]  # Example valuations for equal values for all items
     start_time = time.time()
-    egalitarian_allocation(valuations, puring_rule1=purging_rule1, puring_rule2=purging_rule2)
+    egalitarian_allocation(valuations, purging_rule1=purging_rule1, purging_rule2=purging_rule2)
     end_time = time.time()
     return end_time - start_time
 
@@ -1,5 +1,10 @@
 import doctest
-import networkx as nx
+
+from economic_algorithms.instance import valuations_of
+from economic_algorithms.instrumentation import count, timer
+from economic_algorithms.lazy import lazy_import
+
+nx = lazy_import("networkx")
 
 
 def is_pareto_efficient(valuations: list[list[float]], allocation: list[list[float]]) -> bool:
@@ -7,7 +12,7 @@ def is_pareto_efficient(valuations: list[list[float]], allocation: list[list[flo
        Check if the given allocation is Pareto efficient based on the provided valuations.
 
        Args:
-       valuations (List[List[float]]): List of lists representing valuations of players for items.
+       valuations (List[List[float]]): List of lists representing valuations of players for items, or an Instance.
        allocation (List[List[float]]): List of lists representing the allocation of items to players.
 
        Returns:
@@ -33,6 +38,8 @@ def is_pareto_efficient(valuations: list[list[float]], allocation: list[list[flo
 
     """
 
+    valuations = valuations_of(valuations)
+
     # Base case: if one of the items is not allocated to any player, the allocation is not Pareto efficient
     for item in range(len(valuations[0])):
         if sum(allocation[i][item] for i in range(len(valuations))) == 0:
@@ -40,20 +47,22 @@ def is_pareto_efficient(valuations: list[list[float]], allocation: list[list[flo
             return False
 
     num_players = len(valuations)
-    graph = nx.DiGraph()
+    with timer("is_pareto_efficient.build_graph"):
+        graph = nx.DiGraph()
 
-    # Create directed graph: each node represents a player
-    graph.add_nodes_from(range(num_players))
+        # Create directed graph: each node represents a player
+        graph.add_nodes_from(range(num_players))
 
-    # Add edges: weight is minimum ratio between player i and player j where i receives part of the item
-    for i in range(num_players):
-        for j in range(num_players):
-            if i != j:
-                graph.add_edge(i, j, weight=min(
-                    valuations[i][k] / valuations[j][k] for k in range(num_players) if allocation[i][k] != 0))
+        # Add edges: weight is minimum ratio between player i and player j where i receives part of the item
+        for i in range(num_players):
+            for j in range(num_players):
+                if i != j:
+                    graph.add_edge(i, j, weight=min(
+                        valuations[i][k] / valuations[j][k] for k in range(num_players) if allocation[i][k] != 0))
 
     # Check Pareto efficiency: product of weights in cycles should be >= 1
     for cycle in nx.simple_cycles(graph):
+        count("is_pareto_efficient.cycles")
         product = 1
         for i in range(len(cycle)):
             u, v = cycle[i], cycle[(i + 1) % len(cycle)]  # Current edge (u, v)
@@ -1,4 +1,7 @@
-import networkx as nx
+from economic_algorithms.instrumentation import count, timer
+from economic_algorithms.lazy import lazy_import
+
+nx = lazy_import("networkx")
 
 
 def find_shortest_path(graph, start_node, end_node):
@@ -28,7 +31,9 @@ def find_shortest_path(graph, start_node, end_node):
 
     try:
         # Calculate the shortest path and its weight
-        shortest_path = nx.shortest_path(graph, start_node, end_node, weight="weight")
+        count("find_shortest_path.calls")
+        with timer("find_shortest_path.dijkstra"):
+            shortest_path = nx.shortest_path(graph, start_node, end_node, weight="weight")
         shortest_path_weight = sum(graph[u][v]["weight"] for u, v in zip(shortest_path, shortest_path[1:]))
         # Extract edges and their weights along the shortest path
         edge_weights = [(u, v, graph[u][v]["weight"]) for u, v in zip(shortest_path, shortest_path[1:])]
@@ -47,6 +52,11 @@ def vcg_cheapest_path(graph, start_node, end_node):
         start_node (str): The starting node.
         end_node (str): The ending node.
 
+    Returns:
+        tuple: The edges of the original shortest path with their weights, and the weight
+               difference (payment) of every one of these edges, in the same order.
+               (None, None) when there is no path.
+
     Example:
     >>> edges = [("A", "B", {"weight": 3}),("A", "C", {"weight": 5}),("A", "D", {"weight": 10}),("B", "C", {"weight": 1}),("C", "D", {"weight": 1}),("B", "D", {"weight": 4}),]
     >>> G = nx.Graph()
@@ -63,20 +73,24 @@ def vcg_cheapest_path(graph, start_node, end_node):
     After removing ('C', 'D'):
       New path: [('A', 'B', 3), ('B', 'D', 4)]
       Weight difference: -3
+    ([('A', 'B', 3), ('B', 'C', 1), ('C', 'D', 1)], [-4, -2, -3])
     """
 
     # Find the original shortest path
     shortest_path_weight, shortest_path = find_shortest_path(graph, start_node, end_node)
     if not shortest_path:
         print("No path found between", start_node, "and", end_node)
-        return
+        return None, None
 
     print("Original shortest path:", shortest_path)
     print("Original shortest path weight:", shortest_path_weight)
 
+    weight_differences = []
     for edge in shortest_path:
         removed_edge = edge[0], edge[1]
-        graph_copy = graph.copy()
+        count("vcg_cheapest_path.removed_edges")
+        with timer("vcg_cheapest_path.copy_graph"):
+            graph_copy = graph.copy()
         graph_copy.remove_edge(*removed_edge)
 
         # Find the new shortest path after removing the edge
@@ -91,6 +105,9 @@ def vcg_cheapest_path(graph, start_node, end_node):
         else:
             print(f"After removing {removed_edge}: No path found.")
         print(f"  Weight difference:", weight_difference)
+        weight_differences.append(weight_difference)
+
+    return shortest_path, weight_differences
 
 
 if __name__ == "__main__":
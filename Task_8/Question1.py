@@ -1,22 +1,36 @@
+from economic_algorithms.instance import Instance
+from economic_algorithms.instrumentation import count
+from economic_algorithms.lazy import lazy_import
+
+np = lazy_import("numpy")
+
+
 def elect_next_budget_item(votes: list[set[str]], balances: list[float], costs: dict[str, float]):
     """
     Elects the next item to purchase based on the provided votes, balances, and costs.
     Updates balances accordingly and prints the chosen item and the updated balances.
+    The votes can also be an Instance whose approvals are indexed by the item names.
     """
+    if isinstance(votes, Instance):
+        elect_with_approvals(votes, balances, costs)
+        return
+
     # Incremental amount to increase balances if needed
     increment_amount = 0.01
     count_increases = 0
 
+    # The citizens who voted for each item, found once instead of in every round
+    supporters = {item: [i for i in range(len(votes)) if item in votes[i]] for item in costs}
+
     while True:
         # Check if an item can be purchased with current balances
         for item, cost in costs.items():
-            total_balance = sum(balances[i] for i in range(len(votes)) if item in votes[i])
+            total_balance = sum(balances[i] for i in supporters[item])
             if round(total_balance) >= cost:
                 # Print the chosen item and the updated balances
                 print(f"After adding {increment_amount * count_increases:.2f} to each citizen, \"{item}\" is chosen.")
-                for i, vote in enumerate(votes):
-                    if item in vote:
-                        balances[i] = 0  # Reset balance to 0 for citizens who voted for the chosen item
+                for i in supporters[item]:
+                    balances[i] = 0  # Reset balance to 0 for citizens who voted for the chosen item
                 for i, balance in enumerate(balances):
                     print(f"Citizen {i} has {balance:.2f} remaining balance.")
                 return
@@ -25,6 +39,37 @@ def elect_next_budget_item(votes: list[set[str]], balances: list[float], costs:
         for i in range(len(balances)):
             balances[i] += increment_amount
         count_increases += 1
+        count("elect_next_budget_item.top_up_rounds")
+
+
+def elect_with_approvals(votes: Instance, balances: list[float], costs: dict[str, float]):
+    """
+    Same as elect_next_budget_item for an Instance. The balances are topped up as one array, and the
+    supporters of an item are read from its approvals column. The balance of an item is still added
+    up in the order of the citizens, so it is rounded exactly as in elect_next_budget_item.
+    """
+    increment_amount = 0.01
+    count_increases = 0
+
+    supporters = {item: np.array(votes.supporters(item), dtype=int) for item in costs}
+    current_balances = np.array(balances, dtype=float)
+
+    while True:
+        for item, cost in costs.items():
+            total_balance = sum(current_balances[supporters[item]].tolist())
+            if round(total_balance) >= cost:
+                print(f"After adding {increment_amount * count_increases:.2f} to each citizen, \"{item}\" is chosen.")
+                if count_increases:
+                    balances[:] = current_balances.tolist()
+                for i in supporters[item].tolist():
+                    balances[i] = 0  # Reset balance to 0 for citizens who voted for the chosen item
+                for i, balance in enumerate(balances):
+                    print(f"Citizen {i} has {balance:.2f} remaining balance.")
+                return
+
+        current_balances += increment_amount
+        count_increases += 1
+        count("elect_next_budget_item.top_up_rounds")
 
 
 if __name__ == "__main__":
@@ -1,42 +1,59 @@
-import networkx as nx
-import matplotlib.pyplot as plt
+from economic_algorithms.instance import Instance
+from economic_algorithms.instrumentation import timer
+from economic_algorithms.lazy import lazy_import
 
+nx = lazy_import("networkx")
+plt = lazy_import("matplotlib.pyplot")
+
+
+def find_decomposition(budget, preferences, draw=True):
+    # draw=False skips the graph drawing, for batch runs and benchmarks
+    # The preferences can also be an Instance whose item names are the subjects (indices into budget)
+    if isinstance(preferences, Instance):
+        subjects = preferences.item_names
+        preferences = [[subjects[item] for item in preferences.approved_items(i)] for i in range(preferences.num_agents)]
 
-def find_decomposition(budget, preferences):
     n = len(preferences)  # Number of persons
 
     total_budget = sum(budget)
 
+    # Node names, built once
+    person_nodes = ['p' + str(i) for i in range(n)]
+    subject_nodes = ['s' + str(j) for j in range(len(budget))]
+
     G = nx.DiGraph()  # Create a directed graph
 
     # Add nodes for persons and subjects
-    for i in range(n):
-        G.add_node('p' + str(i))  # Person node
-    for j in range(len(budget)):
-        G.add_node('s' + str(j))  # Subject node
+    G.add_nodes_from(person_nodes)
+    G.add_nodes_from(subject_nodes)
 
     # Add edges from source 's' to persons with capacity c/n
-    for i in range(n):
-        G.add_edge('s', 'p' + str(i), capacity=total_budget / n)
+    for person in person_nodes:
+        G.add_edge('s', person, capacity=total_budget / n)
 
     # Add edges from persons to subjects based on preferences
     for i, person_pref in enumerate(preferences):
         for subject in person_pref:
-            G.add_edge('p' + str(i), 's' + str(subject), capacity=total_budget / n)
+            G.add_edge(person_nodes[i], subject_nodes[subject], capacity=total_budget / n)
 
     # Add edges from subjects to sink 't' with capacity equal to the subject's budget
     for j, subj_budget in enumerate(budget):
-        G.add_edge('s' + str(j), 't', capacity=subj_budget)
+        G.add_edge(subject_nodes[j], 't', capacity=subj_budget)
 
     # Draw the graph for visualization
-    pos = nx.spring_layout(G)
-    nx.draw(G, pos, with_labels=True, node_size=800)
-    labels = nx.get_edge_attributes(G, 'capacity')
-    nx.draw_networkx_edge_labels(G, pos, edge_labels=labels)
-    plt.show()
+    if draw:
+        with timer("find_decomposition.draw"):
+            pos = nx.spring_layout(G)
+            nx.draw(G, pos, with_labels=True, node_size=800)
+            labels = nx.get_edge_attributes(G, 'capacity')
+            nx.draw_networkx_edge_labels(G, pos, edge_labels=labels)
+            plt.show()
+            # Do not keep drawing into the same figure on the next call
+            plt.close()
 
     # Find the maximum flow in the network
-    max_flow_value, max_flow_dict = nx.maximum_flow(G, 's', 't')
+    with timer("find_decomposition.maximum_flow"):
+        max_flow_value, max_flow_dict = nx.maximum_flow(G, 's', 't')
 
     decomposition = []
 
@@ -46,13 +63,10 @@ def find_decomposition(budget, preferences):
 
     else:
         # Decompose the flow and update the decomposition matrix
-        for i in range(len(preferences)):
-            row = []
-            for j in range(len(budget)):
-                flow_value = max_flow_dict.get('p' + str(i), {}).get('s' + str(j),
-                                                                     0)  # Get the flow value from person i to subject j
-                row.append(flow_value)
-            decomposition.append(row)
+        for person in person_nodes:
+            person_flow = max_flow_dict.get(person, {})
+            # Get the flow value from person i to subject j
+            decomposition.append([person_flow.get(subject, 0) for subject in subject_nodes])
 
         print("Decomposition:")
         for i, row in enumerate(decomposition):
@@ -0,0 +1,249 @@
+"""
+Benchmarks for every Task module.
+
+For every (function, engine) pair this reports latency percentiles, peak memory (tracemalloc)
+and throughput on seeded workloads, and compares the median latency with the stored baselines.
+
+Latencies depend on the machine, so every run first times a fixed pure-Python calibration
+workload, and the baselines are compared in units of that calibration time. This evens out
+the speed of the machine, not its mix (a machine can be faster at NumPy than at Python), so
+regenerate the baselines with --update-baselines on the machine that checks them when in doubt.
+
+Usage (from the repository root):
+    python benchmarks/run_benchmarks.py                      # run and check against the baselines
+    python benchmarks/run_benchmarks.py --size compute_budget=5000 --only compute_budget
+    python benchmarks/run_benchmarks.py --update-baselines   # store the current results
+
+The exit code is 1 when an engine is slower than its baseline by more than the tolerance.
+A missing baseline, or one stored for another workload size, is reported and not checked.
+"""
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+sys.path.insert(0, ROOT)  # also works from a checkout that is not installed
+
+import workloads
+
+
+def load_task(task, question):
+    """
+    Imports Task_<task>/Question<question>.py.
+    """
+    return importlib.import_module(f"economic_algorithms.Task_{task}.Question{question}")
+
+
+def benchmarks():
+    """
+    Returns the benchmarks: name -> (workload generator, default size, {engine name: function}).
+    binary_search_for_t is not benchmarked because it may never stop on random votes.
+    """
+    task_3 = load_task(3, 2)
+    task_4 = load_task(4, 2)
+    task_5 = load_task(5, 3)
+    task_7 = load_task(7, 2)
+    task_8 = load_task(8, 1)
+    task_9 = load_task(9, 3)
+    task_10 = load_task(10, 5)
+
+    return {
+        "weighted_round_robin": (workloads.round_robin_workload, 60, {
+            "reference": task_3.weighted_round_robin,
+        }),
+        "egalitarian_allocation": (workloads.two_players_workload, 5, {
+            "reference": task_4.egalitarian_allocation,
+            "no_pruning": lambda valuations: task_4.egalitarian_allocation(valuations, False, False),
+        }),
+        "product_maximizing_allocation": (workloads.two_players_workload, 5, {
+            "reference": task_4.product_maximizing_allocation,
+            "no_pruning": lambda valuations: task_4.product_maximizing_allocation(valuations, False, False),
+        }),
+        "is_pareto_efficient": (workloads.pareto_workload, 6, {
+            "reference": task_5.is_pareto_efficient,
+        }),
+        "vcg_cheapest_path": (workloads.path_workload, 200, {
+            "reference": task_7.vcg_cheapest_path,
+        }),
+        "elect_next_budget_item": (workloads.equal_shares_workload, 100, {
+            "reference": task_8.elect_next_budget_item,
+        }),
+        "find_decomposition": (workloads.decomposition_workload, 10, {
+            # Only the decomposition is timed, not the drawing of its graph
+            "reference": lambda budget, preferences: task_9.find_decomposition(budget, preferences, draw=False),
+        }),
+        "compute_budget": (workloads.budget_workload, 200, {
+            "exact": task_10.breakpoint_search_for_t,
+            "numpy": task_10.numpy_binary_search_for_t,
+        }),
+    }
+
+
+def percentile(sorted_values, fraction):
+    """
+    Nearest-rank percentile of an already sorted list, None when there are too few values
+    for it to be anything else than the maximum.
+    """
+    if len(sorted_values) < 1 / (1 - fraction):
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def calibrate(repeat=5):
+    """
+    Returns the median time of a fixed pure-Python workload (sorting, arithmetic and a dict),
+    the unit the baselines are compared in.
+    """
+    rng = random.Random(0)
+    values = [rng.random() for _ in range(100000)]
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        sorted(values)
+        sum(value * value for value in values)
+        {value: i for i, value in enumerate(values)}
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def milliseconds(seconds):
+    return "-" if seconds is None else f"{seconds * 1000:.3f}"
+
+
+def measure(function, workload, size, repeat, seed):
+    """
+    Runs the function on `repeat` seeded instances and returns its statistics.
+    Printing is silenced, and the instances are generated outside of the timed part.
+    """
+    rng = random.Random(seed)
+    latencies = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            args = workload(rng, size)
+            start = time.perf_counter()
+            function(*args)
+            latencies.append(time.perf_counter() - start)
+
+        # Peak memory is measured on a separate call, tracemalloc slows the code down
+        args = workload(random.Random(seed), size)
+        tracemalloc.start()
+        function(*args)
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        "size": size,
+        "p50": statistics.median(latencies),
+        "p90": percentile(latencies, 0.9),
+        "p99": percentile(latencies, 0.99),
+        "max": latencies[-1],
+        "peak_memory": peak_memory,
+        "throughput": len(latencies) / sum(latencies),
+    }
+
+
+def parse_sizes(size_args):
+    sizes = {}
+    for size_arg in size_args:
+        name, _, value = size_arg.partition("=")
+        sizes[name] = int(value)
+    return sizes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Task algorithms.")
+    parser.add_argument("--only", nargs="*", help="benchmark only these functions")
+    parser.add_argument("--size", action="append", default=[], metavar="FUNCTION=SIZE",
+                        help="override the workload size of a function")
+    parser.add_argument("--repeat", type=int, default=20, help="number of timed calls per engine")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--tolerance", type=float, default=2.0,
+                        help="fail when p50 is more than tolerance times the baseline")
+    parser.add_argument("--update-baselines", action="store_true")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    sizes = parse_sizes(args.size)
+    baselines = {}
+    if os.path.exists(BASELINES_PATH):
+        with open(BASELINES_PATH) as baselines_file:
+            baselines = json.load(baselines_file)
+
+    calibration = calibrate()
+    print(f"Calibration: {calibration * 1000:.3f} ms (p99 is shown from 100 calls)\n")
+
+    results = {}
+    regressions = []
+    unchecked = []
+    print(f"{'function':<30} {'engine':<12} {'size':>6} {'p50 ms':>10} {'p90 ms':>10} {'p99 ms':>10} "
+          f"{'max ms':>10} {'peak KiB':>10} {'calls/s':>10} {'speedup':>8} {'vs base':>8}")
+    for name, (workload, default_size, engines) in benchmarks().items():
+        if args.only and name not in args.only:
+            continue
+        size = sizes.get(name, default_size)
+        reference_p50 = None
+        for engine, function in engines.items():
+            key = f"{name}/{engine}"
+            result = measure(function, workload, size, args.repeat, args.seed)
+            result["calibration"] = calibration
+            results[key] = result
+            # The first engine of a function is the one the others are compared with
+            if reference_p50 is None:
+                reference_p50 = result["p50"]
+
+            baseline = baselines.get(key)
+            ratio = ""
+            if baseline is None:
+                unchecked.append(f"{key}: no baseline")
+            elif baseline["size"] != size:
+                unchecked.append(f"{key}: the baseline is for size {baseline['size']}, not {size}")
+            elif "calibration" not in baseline:
+                unchecked.append(f"{key}: the baseline has no calibration, regenerate it")
+            else:
+                # Both latencies in units of the calibration time of their own run
+                ratio = (result["p50"] / calibration) / (baseline["p50"] / baseline["calibration"])
+                if ratio > args.tolerance:
+                    regressions.append(f"{key}: p50 {result['p50'] * 1000:.3f} ms is {ratio:.2f}x the baseline "
+                                       f"{baseline['p50'] * 1000:.3f} ms, after calibration")
+                ratio = f"{ratio:.2f}x"
+            print(f"{name:<30} {engine:<12} {size:>6} {milliseconds(result['p50']):>10} "
+                  f"{milliseconds(result['p90']):>10} {milliseconds(result['p99']):>10} "
+                  f"{milliseconds(result['max']):>10} {result['peak_memory'] / 1024:>10.1f} "
+                  f"{result['throughput']:>10.1f} {reference_p50 / result['p50']:>7.2f}x {ratio:>8}")
+
+    if args.json:
+        with open(args.json, "w") as json_file:
+            json.dump(results, json_file, indent=2)
+
+    if args.update_baselines:
+        baselines.update(results)
+        with open(BASELINES_PATH, "w") as baselines_file:
+            json.dump(baselines, baselines_file, indent=2, sort_keys=True)
+        print("Baselines updated:", BASELINES_PATH)
+        return 0
+
+    if unchecked:
+        print("\nWARNING, NOT CHECKED AGAINST A BASELINE:")
+        for reason in unchecked:
+            print("  " + reason)
+
+    if regressions:
+        print("\nPERFORMANCE REGRESSIONS:")
+        for regression in regressions:
+            print("  " + regression)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
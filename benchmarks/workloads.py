@@ -0,0 +1,85 @@
+"""
+Seeded workload generators for the benchmarks.
+
+Every generator takes a random.Random and a size, and returns the positional arguments of one call.
+A new instance is generated for every call, because several algorithms change their inputs
+(elect_next_budget_item resets balances, is_pareto_efficient improves the allocation).
+"""
+import random
+
+import networkx as nx
+
+
+def round_robin_workload(rng: random.Random, size: int):
+    """
+    size items shared by size // 10 players (at least 2).
+    """
+    num_players = max(2, size // 10)
+    rights = [rng.randint(1, 5) for _ in range(num_players)]
+    valuations = [[rng.randint(1, 100) for _ in range(size)] for _ in range(num_players)]
+    return rights, valuations, 0.5
+
+
+def two_players_workload(rng: random.Random, size: int):
+    """
+    size items valued by two players, for the BFS allocations of Task_4.
+    """
+    return ([[rng.randint(1, 20) for _ in range(size)] for _ in range(2)],)
+
+
+def pareto_workload(rng: random.Random, size: int):
+    """
+    size players and size items, every item is given entirely to one player.
+    """
+    valuations = [[rng.randint(1, 10) for _ in range(size)] for _ in range(size)]
+    owners = list(range(size))
+    rng.shuffle(owners)
+    allocation = [[1 if owners[item] == player else 0 for item in range(size)] for player in range(size)]
+    return valuations, allocation
+
+
+def path_workload(rng: random.Random, size: int):
+    """
+    A connected graph with size nodes and about 3 * size weighted edges, from node 0 to node size - 1.
+    """
+    graph = nx.Graph()
+    for node in range(size - 1):
+        graph.add_edge(node, node + 1, weight=rng.randint(1, 10))
+    for _ in range(2 * size):
+        u, v = rng.sample(range(size), 2)
+        graph.add_edge(u, v, weight=rng.randint(1, 10))
+    return graph, 0, size - 1
+
+
+def equal_shares_workload(rng: random.Random, size: int):
+    """
+    size citizens approving some of 10 items that cost size each.
+    """
+    items = [chr(ord("A") + i) for i in range(10)]
+    votes = [set(rng.sample(items, rng.randint(1, 4))) for _ in range(size)]
+    balances = [0.0] * size
+    costs = {item: size for item in items}
+    return votes, balances, costs
+
+
+def decomposition_workload(rng: random.Random, size: int):
+    """
+    size persons supporting some of 5 subjects, the budget is decomposable by construction.
+    """
+    num_subjects = 5
+    preferences = [set(rng.sample(range(num_subjects), rng.randint(1, 3))) for _ in range(size)]
+    budget = [0] * num_subjects
+    for person_pref in preferences:
+        budget[rng.choice(sorted(person_pref))] += 10
+    return budget, preferences
+
+
+def budget_workload(rng: random.Random, size: int):
+    """
+    size citizens splitting a budget of 1000 between 10 topics.
+    """
+    citizen_votes = []
+    for _ in range(size):
+        weights = [rng.random() for _ in range(10)]
+        citizen_votes.append([1000 * weight / sum(weights) for weight in weights])
+    return 1000, citizen_votes
@@ -0,0 +1,320 @@
+import contextlib
+import http.client
+import importlib
+import io
+import json
+import subprocess
+import sys
+import threading
+import time
+import unittest
+import unittest.mock
+import urllib.request
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import economic_algorithms
+import economic_algorithms.cli
+from economic_algorithms.cli import make_server, run_instance, run_lines
+from economic_algorithms.differential import PAIRS, DifferentialPair, check_pair, reference_budget
+from economic_algorithms.instance import Instance
+from economic_algorithms.instrumentation import collect, count
+
+HEAVY_MODULES = ["matplotlib", "networkx", "numpy", "scipy"]
+
+# Imports a module in a fresh interpreter and reports the time and the heavy modules loaded
+COLD_START = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+{use}
+print(json.dumps({{"seconds": time.perf_counter() - start,
+                  "heavy": [name for name in {heavy!r} if name in sys.modules]}}))
+"""
+
+
+def cold_start(use="", module="economic_algorithms"):
+    code = COLD_START.format(module=module, use=use, heavy=HEAVY_MODULES)
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+class TestColdStart(unittest.TestCase):
+    def test_package_import_is_light(self):
+        self.assertEqual(cold_start()["heavy"], [])
+
+    def test_package_import_is_faster_than_numpy(self):
+        # Relative to a cold NumPy import, so a slow machine slows both sides
+        package_seconds = min(cold_start()["seconds"] for _ in range(3))
+        numpy_seconds = min(cold_start(module="numpy")["seconds"] for _ in range(3))
+        self.assertLess(package_seconds, numpy_seconds,
+                        f"import economic_algorithms took {package_seconds:.4f}s, import numpy {numpy_seconds:.4f}s")
+
+    def test_light_algorithms_do_not_load_heavy_modules(self):
+        result = cold_start("economic_algorithms.weighted_round_robin([1, 2], [[1, 2], [2, 1]], 0.5)\n"
+                            "economic_algorithms.compute_budget(100, [[100, 0], [0, 100]])\n"
+                            "economic_algorithms.elect_next_budget_item([{'A'}], [0.0], {'A': 1})")
+        self.assertEqual(result["heavy"], [])
+
+    def test_heavy_modules_load_on_first_use(self):
+        self.assertEqual(cold_start("economic_algorithms.vcg_cheapest_path")["heavy"], [])
+        result = cold_start("economic_algorithms.is_pareto_efficient([[1, 2], [2, 1]], [[0, 1], [1, 0]])")
+        self.assertEqual(result["heavy"], ["networkx"])
+
+    def test_task_modules_are_subpackages(self):
+        self.assertEqual(economic_algorithms.compute_budget.__module__, "economic_algorithms.Task_10.Question5")
+
+    def test_only_task_folders_are_subpackages(self):
+        for name in ["economic_algorithms.economic_algorithms", "economic_algorithms.benchmarks"]:
+            with self.assertRaises(ImportError):
+                importlib.import_module(name)
+
+
+class TestPublicApi(unittest.TestCase):
+    def test_every_name_is_available(self):
+        for name in economic_algorithms.__all__:
+            self.assertTrue(callable(getattr(economic_algorithms, name)), name)
+
+    def test_unknown_name(self):
+        with self.assertRaises(AttributeError):
+            economic_algorithms.not_an_algorithm
+
+
+class TestInstrumentation(unittest.TestCase):
+    def test_threads_collect_their_own_counters(self):
+        barrier = threading.Barrier(2)
+        results = []
+
+        def run():
+            with collect() as stats:
+                barrier.wait()
+                for _ in range(50):
+                    count("rounds")
+                barrier.wait()
+            results.append(stats.counters["rounds"])
+
+        threads = [threading.Thread(target=run) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, [50, 50])
+
+    def test_nested_collectors(self):
+        with collect() as outer:
+            count("rounds")
+            with collect() as inner:
+                count("rounds")
+        self.assertEqual((outer.counters, inner.counters), ({"rounds": 2}, {"rounds": 1}))
+
+    def test_one_profiled_block_at_a_time(self):
+        with collect(profile=True):
+            with self.assertRaises(ValueError):
+                with collect(profile=True):
+                    pass
+        with collect(profile=True) as stats:
+            pass
+        self.assertIsNotNone(stats.profile)
+
+
+class TestBatchRunner(unittest.TestCase):
+    def instances(self, count):
+        return [json.dumps({"id": i, "mechanism": "budget", "total_budget": 100,
+                            "citizen_votes": [[100 - i, i], [i, 100 - i]]}) for i in range(count)]
+
+    def test_results_keep_input_order(self):
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            results = [json.loads(line) for line in run_lines(self.instances(20), executor, batch_size=3,
+                                                             max_pending=2)]
+        self.assertEqual([result["id"] for result in results], list(range(20)))
+        self.assertEqual(results[0]["result"], [50.0, 50.0])
+
+    def test_in_process_matches_pool(self):
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            self.assertEqual(list(run_lines(self.instances(5))), list(run_lines(self.instances(5), executor)))
+
+    def test_errors_do_not_stop_the_batch(self):
+        results = [json.loads(line) for line in run_lines(['{"id": 1, "mechanism": "vcg"}', "not json", "",
+                                                           '{"id": 3, "mechanism": "round_robin", '
+                                                           '"rights": [1], "valuations": [[5, 3]], "y": 0.5}'])]
+        self.assertIn("TypeError", results[0]["error"])
+        self.assertIn("JSONDecodeError", results[1]["error"])
+        self.assertEqual(results[2]["result"], [[0, 1]])
+
+    def test_vcg_returns_path_and_payments(self):
+        result = json.loads(run_instance(json.dumps({
+            "mechanism": "vcg", "start_node": "A", "end_node": "D",
+            "edges": [["A", "B", 3], ["A", "C", 5], ["A", "D", 10], ["B", "C", 1], ["C", "D", 1], ["B", "D", 4]]})))
+        self.assertEqual(result["result"], {"path": [["A", "B", 3], ["B", "C", 1], ["C", "D", 1]],
+                                            "payments": [-4, -2, -3]})
+
+    def test_threads_keep_their_own_output(self):
+        def slow(name):
+            for _ in range(3):
+                print(name)
+                time.sleep(0.01)
+            return name
+
+        lines = [json.dumps({"mechanism": "slow", "name": f"instance {i}"}) for i in range(4)]
+        with unittest.mock.patch.dict(economic_algorithms.cli.MECHANISMS, {"slow": slow}):
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                results = [json.loads(result) for result in executor.map(run_instance, lines)]
+        self.assertEqual([result["output"] for result in results], [[f"instance {i}"] * 3 for i in range(4)])
+
+    def test_decomposition_does_not_draw(self):
+        line = json.dumps({"mechanism": "decomposition", "budget": [10, 0, 10], "preferences": [[0, 2], [2]]})
+        result = cold_start(f"import economic_algorithms.cli; economic_algorithms.cli.run_instance({line!r})")
+        self.assertNotIn("matplotlib", result["heavy"])
+
+    @contextlib.contextmanager
+    def serving(self):
+        server = make_server("127.0.0.1", 0, None, batch_size=2, max_pending=1)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        try:
+            yield server.server_port
+        finally:
+            server.shutdown()
+            server.server_close()
+            thread.join()
+
+    def test_server_streams_the_body(self):
+        with self.serving() as port:
+            body = ("\n".join(self.instances(5)) + "\n").encode()
+            url = f"http://127.0.0.1:{port}/run"
+            with urllib.request.urlopen(urllib.request.Request(url, data=body)) as response:
+                results = [json.loads(line) for line in response]
+        self.assertEqual([result["id"] for result in results], list(range(5)))
+
+    def test_server_reads_a_chunked_body(self):
+        # Without a Content-Length, urllib sends an iterable body in chunks, here split inside the lines
+        body = "\n".join(self.instances(5)).encode()
+        parts = [body[first:first + 7] for first in range(0, len(body), 7)]
+        with self.serving() as port:
+            url = f"http://127.0.0.1:{port}/run"
+            with urllib.request.urlopen(urllib.request.Request(url, data=iter(parts))) as response:
+                results = [json.loads(line) for line in response]
+        self.assertEqual([result["id"] for result in results], list(range(5)))
+
+    def test_server_requires_a_length(self):
+        with self.serving() as port:
+            connection = http.client.HTTPConnection("127.0.0.1", port)
+            connection.putrequest("POST", "/run")
+            connection.endheaders()
+            self.assertEqual(connection.getresponse().status, 411)
+            connection.close()
+
+
+class TestInstance(unittest.TestCase):
+    def quiet(self, function, *args):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return function(*args)
+
+    def test_valuations_entry_points(self):
+        valuations = [[4, 5, 6, 7, 8], [8, 7, 6, 5, 4]]
+        instance = Instance.from_valuations(valuations)
+        for function, args in [(economic_algorithms.weighted_round_robin, ([1, 2], valuations, 0.5)),
+                               (economic_algorithms.egalitarian_allocation, (valuations,)),
+                               (economic_algorithms.product_maximizing_allocation, (valuations,))]:
+            instance_args = tuple(instance if arg is valuations else arg for arg in args)
+            self.assertEqual(self.quiet(function, *args), self.quiet(function, *instance_args))
+
+    def test_pareto_efficiency(self):
+        valuations = [[3, 1, 6], [6, 3, 1], [1, 6, 3]]
+        instance = Instance.from_valuations(valuations)
+        self.assertFalse(self.quiet(economic_algorithms.is_pareto_efficient, instance,
+                                    [[1, 0, 0], [0, 1, 0], [0, 0, 1]]))
+        self.assertTrue(self.quiet(economic_algorithms.is_pareto_efficient, instance,
+                                   [[0, 0, 1], [1, 0, 0], [0, 1, 0]]))
+
+    def test_budget(self):
+        votes = [[3, 0, 27], [0, 20, 10], [15, 15, 0]]
+        expected = self.quiet(economic_algorithms.compute_budget, 30, votes)
+        for function in (economic_algorithms.compute_budget, economic_algorithms.numpy_binary_search_for_t):
+            result = self.quiet(function, 30, Instance.from_valuations(votes))
+            for value, expected_value in zip(result, expected):
+                self.assertAlmostEqual(value, expected_value)
+
+    def test_approvals_entry_points(self):
+        votes = [{"Park", "Trees"}, {"Trees"}, {"Park", "Lights"}, {"Lights"}, {"Park"}]
+        costs = {"Park": 10, "Trees": 20, "Lights": 30}
+        balances = [1.5, 2.4, 3.3, 4.2, 5.1]
+        instance_balances = list(balances)
+        self.quiet(economic_algorithms.elect_next_budget_item, votes, balances, costs)
+        self.quiet(economic_algorithms.elect_next_budget_item, Instance.from_approvals(votes), instance_balances,
+                   costs)
+        self.assertEqual(balances, instance_balances)
+
+        preferences = [{0, 1}, {0, 2}, {0, 3}, {1, 2}, {0}]
+        instance = Instance.from_approvals(preferences, item_names=range(4))
+        self.assertEqual(self.quiet(economic_algorithms.find_decomposition, [400, 50, 50, 0], preferences, False),
+                         self.quiet(economic_algorithms.find_decomposition, [400, 50, 50, 0], instance, False))
+
+    def test_subject_nobody_approved(self):
+        # Subject 1 is not an item of the instance, so the subjects are not the item ids
+        preferences = [{0, 2}, {2}]
+        self.assertEqual(self.quiet(economic_algorithms.find_decomposition, [10, 0, 10],
+                                    Instance.from_approvals(preferences), False),
+                         [[10.0, 0, 0], [0, 0, 10.0]])
+
+    def test_item_nobody_voted_for(self):
+        votes = [{"A"}, {"A", "B"}]
+        costs = {"A": 1, "B": 1, "C": 5}
+        balances = [0.0, 0.0]
+        instance_balances = list(balances)
+        self.quiet(economic_algorithms.elect_next_budget_item, votes, balances, costs)
+        self.quiet(economic_algorithms.elect_next_budget_item, Instance.from_approvals(votes), instance_balances,
+                   costs)
+        self.assertEqual(balances, instance_balances)
+
+    def test_valuations_keep_list_behaviour(self):
+        valuations = [[4, 5], [8, 7]]
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            economic_algorithms.weighted_round_robin([1, 1], Instance.from_valuations(valuations), 0.5)
+        self.assertIn("with value 8\n", output.getvalue())
+        with self.assertRaises(ZeroDivisionError):
+            self.quiet(economic_algorithms.is_pareto_efficient, Instance.from_valuations([[1, 1], [0, 1]]),
+                       [[1, 0], [0, 1]])
+
+    def test_views(self):
+        instance = Instance.from_approvals([{"a"}, {"b"}, {"a", "c"}])
+        items = instance.items(slice(0, 2))
+        self.assertEqual(items.item_names, ["a", "b"])
+        self.assertEqual(items.supporters("a"), [0, 2])
+        items.approvals[1, 1] = False
+        self.assertFalse(instance.approvals[1, 1])
+        self.assertEqual(instance.agents([2, 0]).approved_items(0), [0, 2])
+
+    def test_bad_shapes(self):
+        with self.assertRaises(ValueError):
+            Instance(valuations=[[1, 2]], approvals=[[True]])
+        with self.assertRaises(ValueError):
+            Instance.from_valuations([[1, 2]], item_names=["only one"])
+
+
+class TestDifferential(unittest.TestCase):
+    def test_fast_engines_match_the_reference(self):
+        for pair in PAIRS.values():
+            report = check_pair(pair, time_budget=5, max_examples=200, growth=10)
+            self.assertEqual(report["mismatches"], [], pair.name)
+            self.assertGreater(report["speedup"]["p50"], 0)
+
+    def test_mismatch_is_shrunk(self):
+        def broken_budget(instance):
+            total_budget, citizen_votes = instance
+            medians = reference_budget(instance)
+            # Wrong as soon as there are 3 citizens and 2 topics
+            if len(citizen_votes) >= 3 and len(citizen_votes[0]) >= 2:
+                medians[0] += 1
+            return medians
+
+        pair = PAIRS["budget_exact"]
+        broken = DifferentialPair("broken", pair.generate, pair.reference, broken_budget, pair.same, pair.shrink)
+        report = check_pair(broken, time_budget=5, max_examples=200)
+        self.assertTrue(report["mismatches"])
+        total_budget, citizen_votes = report["mismatches"][0]["instance"]
+        self.assertEqual((len(citizen_votes), len(citizen_votes[0])), (3, 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,247 @@
+"""
+Batch entry point: runs the algorithms over JSON Lines instances and streams JSON Lines results.
+
+Every input line is one instance: a "mechanism" name, an optional "id", and the arguments of the
+algorithm, for example
+    {"id": 1, "mechanism": "budget", "total_budget": 100, "citizen_votes": [[100, 0], [0, 100]]}
+
+Every output line has the "id", the "result" of the algorithm (or an "error") and the lines the
+algorithm printed in "output". Results are written in input order.
+
+Usage:
+    python -m economic_algorithms run instances.jsonl -o results.jsonl --workers 4
+    python -m economic_algorithms serve --port 8000      # POST JSON Lines to /run
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import islice
+
+import economic_algorithms
+from economic_algorithms.lazy import lazy_import
+
+nx = lazy_import("networkx")
+
+# redirect_stdout replaces sys.stdout for the whole process, so the instances of this process
+# run one at a time, even when several threads of the server call run_instance
+_stdout_lock = threading.Lock()
+
+
+def _vcg(edges, start_node, end_node):
+    graph = nx.Graph()
+    graph.add_weighted_edges_from(edges)
+    path, payments = economic_algorithms.vcg_cheapest_path(graph, start_node, end_node)
+    return {"path": path, "payments": payments}
+
+
+def _decomposition(budget, preferences):
+    return economic_algorithms.find_decomposition(budget, preferences, draw=False)
+
+
+def _equal_shares(votes, balances, costs):
+    # The algorithm updates the balances, they are the result
+    economic_algorithms.elect_next_budget_item([set(vote) for vote in votes], balances, costs)
+    return balances
+
+
+# Mechanism name -> algorithm of the public API, or adapter for arguments that are not plain JSON
+MECHANISMS = {
+    "round_robin": "weighted_round_robin",
+    "egalitarian": "egalitarian_allocation",
+    "product": "product_maximizing_allocation",
+    "pareto": "is_pareto_efficient",
+    "vcg": _vcg,
+    "equal_shares": _equal_shares,
+    "decomposition": _decomposition,
+    "budget": "compute_budget",
+}
+
+
+def run_instance(line):
+    """
+    Runs one JSON line and returns the JSON line of its result.
+
+    >>> run_instance('{"id": 7, "mechanism": "budget", "total_budget": 100, "citizen_votes": [[100, 0], [0, 100]]}')
+    '{"id": 7, "result": [50.0, 50.0], "output": ["The right t is: 0.5"]}'
+    >>> run_instance('{"mechanism": "unknown"}')
+    '{"id": null, "error": "ValueError: unknown mechanism \\'unknown\\'", "output": []}'
+    """
+    record = {"id": None}
+    output = io.StringIO()
+    try:
+        instance = json.loads(line)
+        record["id"] = instance.pop("id", None)
+        mechanism = instance.pop("mechanism", None)
+        if mechanism not in MECHANISMS:
+            raise ValueError(f"unknown mechanism {mechanism!r}")
+        function = MECHANISMS[mechanism]
+        if isinstance(function, str):
+            function = getattr(economic_algorithms, function)
+        with _stdout_lock, contextlib.redirect_stdout(output):
+            record["result"] = function(**instance)
+    except Exception as error:
+        record["error"] = f"{type(error).__name__}: {error}"
+    record["output"] = output.getvalue().splitlines()
+    return json.dumps(record, default=float)
+
+
+def run_batch(lines):
+    return [run_instance(line) for line in lines]
+
+
+def _batches(lines, batch_size):
+    lines = (line for line in lines if line.strip())
+    while True:
+        batch = list(islice(lines, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def run_lines(lines, executor=None, batch_size=64, max_pending=8):
+    """
+    Runs the JSON lines and yields their results in input order.
+
+    Lines are sent to the executor in batches, and at most max_pending batches are in flight,
+    so a fast reader never holds more than that many instances in memory.
+    Without an executor the instances run in this process.
+    """
+    if executor is None:
+        for batch in _batches(lines, batch_size):
+            yield from run_batch(batch)
+        return
+
+    pending = deque()
+    for batch in _batches(lines, batch_size):
+        if len(pending) >= max_pending:
+            yield from pending.popleft().result()
+        pending.append(executor.submit(run_batch, batch))
+    while pending:
+        yield from pending.popleft().result()
+
+
+def make_executor(workers):
+    """
+    Returns a process pool with the given number of workers, or None to run in this process.
+    """
+    if workers == 0:
+        return None
+    return ProcessPoolExecutor(max_workers=workers)
+
+
+def make_server(host, port, executor, batch_size, max_pending):
+    """
+    Returns an HTTP server for POST /run: the body is JSON Lines and the response streams the result lines.
+    The body is read line by line as the batches are sent, so a large body is never held in memory.
+    The body has a Content-Length or is chunked, other requests get 411 Length Required.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.0"
+
+        def is_chunked(self):
+            return self.headers.get("Transfer-Encoding", "").strip().lower().endswith("chunked")
+
+        def body_parts(self):
+            if not self.is_chunked():
+                remaining = int(self.headers["Content-Length"])
+                while remaining > 0:
+                    part = self.rfile.readline(min(remaining, 65536))
+                    if not part:
+                        return
+                    remaining -= len(part)
+                    yield part
+                return
+            while True:
+                size = int(self.rfile.readline().split(b";")[0], 16)
+                if size == 0:
+                    # Skip the trailer up to the blank line that ends the body
+                    while self.rfile.readline().strip():
+                        pass
+                    return
+                yield self.rfile.read(size)
+                self.rfile.readline()
+
+        def body_lines(self):
+            pending = b""
+            for part in self.body_parts():
+                *lines, pending = (pending + part).split(b"\n")
+                for line in lines:
+                    yield line.decode()
+            if pending:
+                yield pending.decode()
+
+        def do_POST(self):
+            if self.path != "/run":
+                self.send_error(404)
+                return
+            if not self.is_chunked() and "Content-Length" not in self.headers:
+                self.send_error(411)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.end_headers()
+            for result in run_lines(self.body_lines(), executor, batch_size, max_pending):
+                self.wfile.write((result + "\n").encode())
+
+    return ThreadingHTTPServer((host, port), Handler)
+
+
+def serve(host, port, executor, batch_size, max_pending):
+    """
+    Serves POST /run until interrupted, see make_server.
+    """
+    server = make_server(host, port, executor, batch_size, max_pending)
+    print(f"Serving on http://{host}:{server.server_port}/run")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="economic_algorithms", description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: number of CPUs, 0 to run in this process)")
+    parser.add_argument("--batch-size", type=int, default=64, help="instances sent to a worker at a time")
+    parser.add_argument("--max-pending", type=int, default=None,
+                        help="batches in flight before reading more input (default: twice the workers)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_command = commands.add_parser("run", help="run a JSON Lines file (default: standard input)")
+    run_command.add_argument("input", nargs="?", default="-")
+    run_command.add_argument("-o", "--output", default="-")
+    serve_command = commands.add_parser("serve", help="serve POST /run over HTTP")
+    serve_command.add_argument("--host", default="127.0.0.1")
+    serve_command.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args(argv)
+
+    workers = os.cpu_count() if args.workers is None else args.workers
+    max_pending = args.max_pending or 2 * max(1, workers)
+    executor = make_executor(workers)
+    try:
+        if args.command == "serve":
+            serve(args.host, args.port, executor, args.batch_size, max_pending)
+            return 0
+
+        with contextlib.ExitStack() as stack:
+            input_file = sys.stdin if args.input == "-" else stack.enter_context(open(args.input))
+            output_file = sys.stdout if args.output == "-" else stack.enter_context(open(args.output, "w"))
+            for result in run_lines(input_file, executor, args.batch_size, max_pending):
+                output_file.write(result + "\n")
+        return 0
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
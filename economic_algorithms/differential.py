@@ -0,0 +1,332 @@
+"""
+Differential testing of fast engines against the reference code.
+
+A DifferentialPair has a seeded generator of instances whose size grows during the run,
+a reference and a fast engine, a comparison of their results, and a shrinker that proposes
+smaller instances. check_pair runs both engines on many instances within a time budget;
+when they disagree, the instance is shrunk to a small one that still disagrees, as Hypothesis does.
+
+Usage:
+    python -m economic_algorithms.differential --time-budget 10
+"""
+import argparse
+import contextlib
+import io
+import math
+import operator
+import random
+import statistics
+import sys
+import time
+from typing import Any, Callable, Iterable, List, Optional
+
+from economic_algorithms.instance import Instance
+from economic_algorithms.lazy import lazy_import
+
+round_robin = lazy_import("economic_algorithms.Task_3.Question2")
+equal_shares = lazy_import("economic_algorithms.Task_8.Question1")
+question_5 = lazy_import("economic_algorithms.Task_10.Question5")
+
+
+class DifferentialPair:
+    """
+    A reference engine, a fast engine and how to generate, compare and shrink their instances.
+
+    :param name: Name of the pair in the reports.
+    :param generate: Function (random.Random, size) -> instance.
+    :param reference: Reference engine, called with the instance.
+    :param fast: Fast engine, called with the instance.
+    :param same: Function (reference result, fast result) -> True when they match.
+    :param shrink: Function instance -> smaller instances to try when the engines disagree.
+    """
+
+    def __init__(self, name: str, generate: Callable[[random.Random, int], Any], reference: Callable[[Any], Any],
+                 fast: Callable[[Any], Any], same: Callable[[Any, Any], bool],
+                 shrink: Callable[[Any], Iterable[Any]] = lambda instance: ()):
+        self.name = name
+        self.generate = generate
+        self.reference = reference
+        self.fast = fast
+        self.same = same
+        self.shrink = shrink
+
+    def run(self, engine: Callable[[Any], Any], instance):
+        """
+        Runs an engine on the instance without its prints, returns (result or exception, seconds).
+        """
+        start = time.perf_counter()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = engine(instance)
+        except Exception as error:
+            result = error
+        return result, time.perf_counter() - start
+
+    def disagree(self, instance) -> bool:
+        reference_result, _ = self.run(self.reference, instance)
+        fast_result, _ = self.run(self.fast, instance)
+        return not self.matches(reference_result, fast_result)
+
+    def matches(self, reference_result, fast_result) -> bool:
+        if isinstance(reference_result, Exception) or isinstance(fast_result, Exception):
+            # Both engines must reject the same instances
+            return type(reference_result) is type(fast_result)
+        return self.same(reference_result, fast_result)
+
+
+def shrink_instance(pair: DifferentialPair, instance, max_steps: int = 1000):
+    """
+    Greedily replaces the instance by a smaller one on which the engines still disagree.
+    """
+    for _ in range(max_steps):
+        for candidate in pair.shrink(instance):
+            if pair.disagree(candidate):
+                instance = candidate
+                break
+        else:
+            return instance
+    return instance
+
+
+def check_pair(pair: DifferentialPair, time_budget: float = 5.0, max_examples: Optional[int] = None,
+               seed: int = 0, growth: int = 20, max_size: int = 200) -> dict:
+    """
+    Runs both engines on random instances until the time budget or max_examples is reached.
+    The size starts at 1 and grows by one every `growth` instances, up to max_size.
+
+    :return: Report with the number of examples, the largest size, the shrunk mismatches
+             and the distribution of the speedup (reference time / fast time).
+    """
+    rng = random.Random(seed)
+    speedups = []
+    mismatches = []
+    deadline = time.perf_counter() + time_budget
+    examples = 0
+    size = 1
+    while time.perf_counter() < deadline and (max_examples is None or examples < max_examples):
+        size = min(max_size, 1 + examples // growth)
+        instance = pair.generate(rng, size)
+        reference_result, reference_time = pair.run(pair.reference, instance)
+        fast_result, fast_time = pair.run(pair.fast, instance)
+        examples += 1
+        if not pair.matches(reference_result, fast_result):
+            shrunk = shrink_instance(pair, instance)
+            mismatches.append({"size": size, "instance": shrunk,
+                               "reference": pair.run(pair.reference, shrunk)[0],
+                               "fast": pair.run(pair.fast, shrunk)[0]})
+        elif fast_time > 0:
+            speedups.append(reference_time / fast_time)
+
+    return {
+        "pair": pair.name,
+        "examples": examples,
+        "max_size": size,
+        "mismatches": mismatches,
+        "speedup": speedup_summary(speedups),
+    }
+
+
+def speedup_summary(speedups: List[float]) -> dict:
+    if not speedups:
+        return {}
+    speedups = sorted(speedups)
+    deciles = statistics.quantiles(speedups, n=10) if len(speedups) > 1 else speedups * 9
+    return {"min": speedups[0], "p10": deciles[0], "p50": statistics.median(speedups), "p90": deciles[-1],
+            "max": speedups[-1]}
+
+
+"""
+Task_10: phantom-median budget aggregation
+"""
+
+
+def budget_instance(rng: random.Random, size: int):
+    """
+    (total_budget, citizen_votes) with up to size citizens and topics. Small integer weights
+    make ties between votes, and between votes and phantoms, frequent.
+    """
+    total_budget = rng.choice([1, 30, 100])
+    num_topics = rng.randint(1, size)
+    citizen_votes = [[rng.choice([0, 1, 2, 3, rng.random()]) for _ in range(num_topics)]
+                     for _ in range(rng.randint(1, size))]
+    return total_budget, [_normalize(total_budget, weights) for weights in citizen_votes]
+
+
+def _normalize(total_budget, weights):
+    if sum(weights) == 0:
+        weights = [1] + list(weights[1:])
+    return [total_budget * weight / sum(weights) for weight in weights]
+
+
+def shrink_budget_instance(instance):
+    """
+    Proposes the instance without one citizen, or without one topic.
+    """
+    total_budget, citizen_votes = instance
+    if len(citizen_votes) > 1:
+        for citizen in range(len(citizen_votes)):
+            yield total_budget, citizen_votes[:citizen] + citizen_votes[citizen + 1:]
+    if len(citizen_votes[0]) > 1:
+        for topic in range(len(citizen_votes[0])):
+            yield total_budget, [_normalize(total_budget, votes[:topic] + votes[topic + 1:]) for votes in citizen_votes]
+
+
+def reference_budget(instance):
+    """
+    The original median computation (merge the phantoms, sort, statistics.median), searched with a
+    bisection that stops when the threshold cannot be split any further.
+    """
+    total_budget, citizen_votes = instance
+
+    def reference_medians(threshold):
+        linear_functions = question_5.create_linear_functions(total_budget, threshold, len(citizen_votes))
+        merged_votes = question_5.merge_votes_with_functions(citizen_votes, linear_functions)
+        return [statistics.median(lst) for lst in merged_votes]
+
+    threshold = question_5.search_threshold(total_budget, lambda t: sum(reference_medians(t)))
+    return reference_medians(threshold)
+
+
+def same_medians(reference_result, fast_result) -> bool:
+    return len(reference_result) == len(fast_result) and all(
+        math.isclose(reference, fast, rel_tol=1e-9, abs_tol=1e-9)
+        for reference, fast in zip(reference_result, fast_result))
+
+
+def phantom_medians_instance(rng: random.Random, size: int):
+    total_budget, citizen_votes = budget_instance(rng, size)
+    threshold = rng.choice([0, 1, rng.random(), 1 / rng.randint(1, size + 1)])
+    return total_budget, citizen_votes, threshold
+
+
+def shrink_phantom_medians_instance(instance):
+    total_budget, citizen_votes, threshold = instance
+    for smaller in shrink_budget_instance((total_budget, citizen_votes)):
+        yield smaller + (threshold,)
+
+
+def reference_phantom_medians(instance):
+    total_budget, citizen_votes, threshold = instance
+    linear_functions = question_5.create_linear_functions(total_budget, threshold, len(citizen_votes))
+    return [statistics.median(lst) for lst in question_5.merge_votes_with_functions(citizen_votes, linear_functions)]
+
+
+def fast_phantom_medians(instance):
+    total_budget, citizen_votes, threshold = instance
+    return question_5.numpy_medians(total_budget, question_5.sorted_votes_matrix(citizen_votes), threshold).tolist()
+
+
+"""
+Task_3 and Task_8: the list code against the same algorithms on the matrices of an Instance
+"""
+
+
+def round_robin_instance(rng: random.Random, size: int):
+    """
+    (rights, valuations, y) with up to size players and items, ties and y=0 included.
+    """
+    num_players = rng.randint(1, size)
+    num_items = rng.randint(1, size)
+    rights = [rng.choice([1, 2, 3, 3 * rng.random()]) for _ in range(num_players)]
+    valuations = [[rng.choice([0, 1, 2, 3, 10 * rng.random()]) for _ in range(num_items)] for _ in range(num_players)]
+    return rights, valuations, rng.choice([0, 0.5, 1, rng.random()])
+
+
+def shrink_round_robin_instance(instance):
+    """
+    Proposes the instance without one player, or without one item.
+    """
+    rights, valuations, y = instance
+    if len(rights) > 1:
+        for player in range(len(rights)):
+            yield rights[:player] + rights[player + 1:], valuations[:player] + valuations[player + 1:], y
+    if len(valuations[0]) > 1:
+        for item in range(len(valuations[0])):
+            yield rights, [values[:item] + values[item + 1:] for values in valuations], y
+
+
+def equal_shares_instance(rng: random.Random, size: int):
+    """
+    (votes, balances, costs) with up to size citizens and items, every citizen approving some items.
+    """
+    items = [f"item {i}" for i in range(rng.randint(1, size))]
+    votes = [set(rng.sample(items, rng.randint(1, len(items)))) for _ in range(rng.randint(1, size))]
+    balances = [rng.choice([0, 0.5, round(rng.random(), 2)]) for _ in votes]
+    costs = {item: rng.choice([1, 2, 5, size]) for item in items}
+    return votes, balances, costs
+
+
+def shrink_equal_shares_instance(instance):
+    """
+    Proposes the instance without one citizen.
+    """
+    votes, balances, costs = instance
+    if len(votes) > 1:
+        for citizen in range(len(votes)):
+            yield votes[:citizen] + votes[citizen + 1:], balances[:citizen] + balances[citizen + 1:], costs
+
+
+def elected_balances(votes, instance):
+    # The algorithm updates the balances, they are the result
+    _, balances, costs = instance
+    balances = list(balances)
+    equal_shares.elect_next_budget_item(votes, balances, costs)
+    return balances
+
+
+PAIRS = {
+    "budget_exact": DifferentialPair("budget_exact", budget_instance, reference_budget,
+                                     lambda instance: question_5.compute_budget(*instance), same_medians,
+                                     shrink_budget_instance),
+    "budget_numpy": DifferentialPair("budget_numpy", budget_instance, reference_budget,
+                                     lambda instance: question_5.numpy_binary_search_for_t(*instance), same_medians,
+                                     shrink_budget_instance),
+    "phantom_medians": DifferentialPair("phantom_medians", phantom_medians_instance, reference_phantom_medians,
+                                        fast_phantom_medians, same_medians, shrink_phantom_medians_instance),
+    "round_robin_matrix": DifferentialPair(
+        "round_robin_matrix", round_robin_instance,
+        lambda instance: round_robin.weighted_round_robin(*instance),
+        lambda instance: round_robin.weighted_round_robin(instance[0], Instance.from_valuations(instance[1]),
+                                                          instance[2]),
+        operator.eq, shrink_round_robin_instance),
+    "equal_shares_matrix": DifferentialPair(
+        "equal_shares_matrix", equal_shares_instance,
+        lambda instance: elected_balances(instance[0], instance),
+        lambda instance: elected_balances(Instance.from_approvals(instance[0]), instance),
+        operator.eq, shrink_equal_shares_instance),
+}
+
+
+def print_report(report: dict):
+    speedup = report["speedup"]
+    print(f"{report['pair']}: {report['examples']} examples up to size {report['max_size']}, "
+          f"{len(report['mismatches'])} mismatches")
+    if speedup:
+        print("  speedup " + ", ".join(f"{name} {value:.2f}x" for name, value in speedup.items()))
+    for mismatch in report["mismatches"][:5]:
+        print(f"  MISMATCH (found at size {mismatch['size']}), shrunk instance: {mismatch['instance']!r}")
+        print(f"    reference: {mismatch['reference']!r}")
+        print(f"    fast:      {mismatch['fast']!r}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Differential tests of the fast engines against the reference.")
+    parser.add_argument("pairs", nargs="*", help=f"pairs to check, among {', '.join(sorted(PAIRS))} (default: all)")
+    parser.add_argument("--time-budget", type=float, default=5.0, help="seconds per pair")
+    parser.add_argument("--max-examples", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    for name in args.pairs:
+        if name not in PAIRS:
+            parser.error(f"unknown pair {name!r}")
+
+    failed = False
+    for name in args.pairs or sorted(PAIRS):
+        report = check_pair(PAIRS[name], args.time_budget, args.max_examples, args.seed)
+        print_report(report)
+        failed = failed or bool(report["mismatches"])
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
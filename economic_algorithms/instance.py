@@ -0,0 +1,183 @@
+"""
+Compact instance representation shared by the algorithms.
+
+An Instance holds a contiguous agents x items valuations matrix and/or a boolean approvals matrix,
+with agents and items numbered 0, 1, ... and lists mapping those ids back to names.
+The algorithms accept an Instance wherever they take valuations, votes or preferences.
+
+weighted_round_robin, elect_next_budget_item and the Task_10 solvers run on the matrices themselves.
+The other algorithms get the valuations as lists (see valuations_of) or the approved item names,
+so for them an Instance only maps names to ids.
+
+>>> instance = Instance.from_approvals([{"Park", "Trees"}, {"Trees"}, {"Lights"}])
+>>> instance.item_names
+['Lights', 'Park', 'Trees']
+>>> instance.approvals.astype(int)
+array([[0, 1, 1],
+       [0, 0, 1],
+       [1, 0, 0]])
+>>> instance.supporters("Trees")
+[0, 1]
+"""
+from __future__ import annotations
+
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence
+
+from economic_algorithms.lazy import lazy_import
+
+np = lazy_import("numpy")
+
+
+class Instance:
+    """
+    Valuations and approvals of agents over items, indexed by integer ids.
+
+    :param valuations: agents x items matrix of values, or None. Integer values stay integers.
+    :param approvals: agents x items boolean matrix, or None.
+    :param agent_names: name of every agent id, default the ids themselves.
+    :param item_names: name of every item id, default the ids themselves.
+    """
+
+    def __init__(self, valuations=None, approvals=None, agent_names: Optional[Sequence[Hashable]] = None,
+                 item_names: Optional[Sequence[Hashable]] = None):
+        if valuations is None and approvals is None:
+            raise ValueError("An instance needs valuations or approvals.")
+        self.valuations = None if valuations is None else np.ascontiguousarray(valuations)
+        self.approvals = None if approvals is None else np.ascontiguousarray(approvals, dtype=bool)
+        if self.valuations is not None and not np.issubdtype(self.valuations.dtype, np.number):
+            raise ValueError("Valuations must be numbers.")
+        matrix = self.valuations if self.valuations is not None else self.approvals
+        if matrix.ndim != 2 or (self.approvals is not None and self.approvals.shape != matrix.shape):
+            raise ValueError("Valuations and approvals must be agents x items matrices of the same shape.")
+
+        num_agents, num_items = matrix.shape
+        self.agent_names = list(range(num_agents)) if agent_names is None else list(agent_names)
+        self.item_names = list(range(num_items)) if item_names is None else list(item_names)
+        if len(self.agent_names) != num_agents or len(self.item_names) != num_items:
+            raise ValueError("There must be one name for every agent and every item.")
+        self._item_ids: Optional[Dict[Hashable, int]] = None
+
+    @classmethod
+    def from_valuations(cls, valuations: Iterable[Iterable[float]], agent_names=None, item_names=None) -> Instance:
+        """
+        Builds an instance from a list of lists of valuations, one list per agent.
+
+        >>> Instance.from_valuations([[4, 5], [8, 7.5]]).valuations
+        array([[4. , 5. ],
+               [8. , 7.5]])
+        """
+        return cls(valuations=valuations, agent_names=agent_names, item_names=item_names)
+
+    @classmethod
+    def from_approvals(cls, votes: Iterable[Iterable[Hashable]], item_names: Optional[Sequence[Hashable]] = None,
+                       agent_names=None) -> Instance:
+        """
+        Builds an instance from the set of approved items of every agent.
+        Items are numbered in the order of item_names, by default in sorted order.
+        """
+        votes = [set(vote) for vote in votes]
+        if item_names is None:
+            item_names = sorted(set().union(*votes))
+        item_ids = {name: item for item, name in enumerate(item_names)}
+        approvals = np.zeros((len(votes), len(item_ids)), dtype=bool)
+        for agent, vote in enumerate(votes):
+            approvals[agent, [item_ids[name] for name in vote]] = True
+        instance = cls(approvals=approvals, agent_names=agent_names, item_names=item_names)
+        instance._item_ids = item_ids
+        return instance
+
+    @property
+    def num_agents(self) -> int:
+        return len(self.agent_names)
+
+    @property
+    def num_items(self) -> int:
+        return len(self.item_names)
+
+    def item_id(self, name: Hashable) -> int:
+        """
+        Returns the id of the item with this name.
+        """
+        return self._ids()[name]
+
+    def _ids(self) -> Dict[Hashable, int]:
+        if self._item_ids is None:
+            self._item_ids = {item_name: item for item, item_name in enumerate(self.item_names)}
+        return self._item_ids
+
+    def supporters(self, name: Hashable) -> List[int]:
+        """
+        Returns the ids of the agents that approve the item with this name,
+        none for a name that is not an item (nobody approved it).
+
+        >>> Instance.from_approvals([{"A"}, {"A", "B"}]).supporters("C")
+        []
+        """
+        item = self._ids().get(name)
+        if item is None:
+            return []
+        return np.flatnonzero(self.approvals[:, item]).tolist()
+
+    def approved_items(self, agent: int) -> List[int]:
+        """
+        Returns the ids of the items approved by the agent.
+        """
+        return np.flatnonzero(self.approvals[agent]).tolist()
+
+    def agents(self, selection) -> Instance:
+        """
+        Returns the instance restricted to some agents.
+        A slice gives views of the matrices (no copy), a list of ids gives copies.
+
+        >>> instance = Instance.from_valuations([[1, 2], [3, 4], [5, 6]], agent_names=["a", "b", "c"])
+        >>> part = instance.agents(slice(1, 3))
+        >>> part.agent_names, np.shares_memory(part.valuations, instance.valuations)
+        (['b', 'c'], True)
+        """
+        return self._select(selection, slice(None))
+
+    def items(self, selection) -> Instance:
+        """
+        Returns the instance restricted to some items, see agents.
+        """
+        return self._select(slice(None), selection)
+
+    def _select(self, agents, items) -> Instance:
+        instance = Instance.__new__(Instance)
+        instance.valuations = None if self.valuations is None else self.valuations[agents, items]
+        instance.approvals = None if self.approvals is None else self.approvals[agents, items]
+        instance.agent_names = _select_names(self.agent_names, agents)
+        instance.item_names = _select_names(self.item_names, items)
+        instance._item_ids = None
+        return instance
+
+    def __repr__(self):
+        return f"Instance({self.num_agents} agents, {self.num_items} items)"
+
+
+def _select_names(names, selection):
+    if isinstance(selection, slice):
+        return names[selection]
+    return [names[i] for i in selection]
+
+
+def valuations_of(valuations, as_lists: bool = True):
+    """
+    Returns the valuations of an Instance, any other valuations unchanged.
+
+    By default the matrix is converted with tolist(), for the algorithms that only index single
+    values: egalitarian_allocation and product_maximizing_allocation sum a few items per search
+    state, and is_pareto_efficient builds a graph. Indexing lists is faster there than indexing
+    a NumPy matrix. Integer values stay Python ints, so the printed output and the errors are the
+    same as with lists.
+
+    :param as_lists: False to get the NumPy matrix itself.
+
+    >>> valuations_of(Instance.from_valuations([[4, 5], [8, 7]]))
+    [[4, 5], [8, 7]]
+    """
+    if isinstance(valuations, Instance):
+        if valuations.valuations is None:
+            raise ValueError("The instance has no valuations.")
+        return valuations.valuations.tolist() if as_lists else valuations.valuations
+    return valuations
@@ -0,0 +1,130 @@
+"""
+Named counters and timers for the main loops of the algorithms.
+
+The algorithms call count() and timer() unconditionally. When nothing is collecting, count()
+returns right away and timer() returns a shared empty context manager, so the cost is one
+function call. The active collectors are kept in a context variable, so a collect() block only
+sees the code run in its own thread or task. To collect, wrap the call:
+
+>>> with collect() as stats:
+...     for _ in range(3):
+...         count("example.rounds")
+...     with timer("example.step"):
+...         pass
+>>> stats.counters
+{'example.rounds': 3}
+>>> stats.timers["example.step"]["calls"]
+1
+"""
+import contextlib
+import contextvars
+import cProfile
+import json
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+_collectors: contextvars.ContextVar[Tuple["Stats", ...]] = contextvars.ContextVar("collectors", default=())
+_no_timer = contextlib.nullcontext()
+# cProfile can only profile one block at a time in the whole process
+_profile_lock = threading.Lock()
+
+
+class Stats:
+    """
+    Counters and timers collected during one collect() block.
+    """
+
+    def __init__(self):
+        self.counters: Dict[str, int] = {}
+        self.timers: Dict[str, Dict[str, float]] = {}
+        self.profile: Optional[cProfile.Profile] = None
+
+    def add_count(self, name: str, amount: int):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def add_time(self, name: str, seconds: float):
+        timer_stats = self.timers.setdefault(name, {"calls": 0, "seconds": 0.0})
+        timer_stats["calls"] += 1
+        timer_stats["seconds"] += seconds
+
+    def as_dict(self) -> dict:
+        """
+        Returns the counters and timers as a plain dictionary.
+        """
+        return {"counters": dict(self.counters), "timers": {name: dict(value) for name, value in self.timers.items()}}
+
+    def to_json(self, **kwargs) -> str:
+        return json.dumps(self.as_dict(), **kwargs)
+
+    def dump_profile(self, path: str):
+        """
+        Writes the cProfile data of the block (collect(profile=True)), readable with pstats or snakeviz.
+        """
+        if self.profile is None:
+            raise ValueError("The block was not profiled, use collect(profile=True).")
+        self.profile.dump_stats(path)
+
+
+def count(name: str, amount: int = 1):
+    """
+    Adds amount to the named counter of every active collector.
+    """
+    collectors = _collectors.get()
+    if not collectors:
+        return
+    for stats in collectors:
+        stats.add_count(name, amount)
+
+
+@contextlib.contextmanager
+def _timer(name: str, collectors: Tuple[Stats, ...]):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        for stats in collectors:
+            stats.add_time(name, seconds)
+
+
+def timer(name: str):
+    """
+    Context manager that adds the time spent in its block to the named timer.
+    """
+    collectors = _collectors.get()
+    if not collectors:
+        return _no_timer
+    return _timer(name, collectors)
+
+
+@contextlib.contextmanager
+def collect(callback: Optional[Callable[[Stats], None]] = None, profile: bool = False):
+    """
+    Collects the counters and timers of the code run inside the block.
+
+    :param callback: Called with the Stats when the block ends.
+    :param profile: Also run cProfile on the block, see Stats.dump_profile. Only one profiled
+                    block can run at a time, a second one raises ValueError.
+    :return: The Stats being filled.
+    """
+    stats = Stats()
+    if profile:
+        if not _profile_lock.acquire(blocking=False):
+            raise ValueError("Another collect(profile=True) block is already running.")
+        try:
+            stats.profile = cProfile.Profile()
+            stats.profile.enable()
+        except BaseException:
+            _profile_lock.release()
+            raise
+    token = _collectors.set(_collectors.get() + (stats,))
+    try:
+        yield stats
+    finally:
+        _collectors.reset(token)
+        if stats.profile is not None:
+            stats.profile.disable()
+            _profile_lock.release()
+        if callback is not None:
+            callback(stats)
@@ -0,0 +1,35 @@
+"""
+Lazy imports of the heavy dependencies.
+
+>>> json = lazy_import("json")
+>>> json.dumps([1])
+'[1]'
+"""
+import importlib
+import sys
+import types
+
+
+class LazyModule(types.ModuleType):
+    """
+    Stands for a module until one of its attributes is used, then imports it.
+    """
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self._lazy_name = name
+
+    def __getattr__(self, attribute: str):
+        module = importlib.import_module(self._lazy_name)
+        # Copy the module namespace so the next lookups do not come back here
+        self.__dict__.update(module.__dict__)
+        return getattr(module, attribute)
+
+
+def lazy_import(name: str) -> types.ModuleType:
+    """
+    Returns the module if it is already imported, otherwise a LazyModule that imports it on first use.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    return LazyModule(name)